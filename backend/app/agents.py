@@ -1,19 +1,71 @@
-﻿import json
+﻿import asyncio
+import json
 import os
+import random
 import re
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Awaitable, Callable
 from pathlib import Path
+from threading import Lock
 from textwrap import dedent
 from typing import Any
 
 from langchain.agents import create_agent
 from langchain.tools import tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
 from langchain_openai import ChatOpenAI
-
-from .search_tool import search_posts
+from pydantic import BaseModel
+
+from .audit_policy import (
+    AUDIT_MODE,
+    choose_audit_path,
+    drain_deferred_audits,
+    record_audit_path,
+    record_clean_check,
+    schedule_deferred_audit,
+)
+from .audit_rules import RuleMatch, get_rule_engine
+from .fake_llm import FakeChatModel
+from .prompt_budget import NODE_BUDGETS, count_tokens, fit_prompt, render_message, select_leader_fields
+from .response_cache import cache_key, get_node_cache, record_lookup
+from .scheduler import GraphNode, run_graph
+from .search_tool import SearchIndexUnavailable, index_version, search_posts
+from .supporting_jobs import SUPPORTING_MODE, SUPPORTING_MODES, drain_supporting_jobs, schedule_supporting_job
+from .telemetry import LLM_CALL_DURATION, LLM_HEDGES, LLM_RETRY_COUNT, LLM_TOKENS, ORCHESTRATION_DURATION, span
 
 NODE_NAMES = ["yapper", "definer", "redditor", "engager", "auditor"]
 SUPPORTING_NODES = {"definer", "redditor", "engager"}
+# Messages of conversation history included in each node prompt.
+HISTORY_WINDOW = 8
+
+# "single_pass" asks for the parsed fields and the user-facing reply in one structured call.
+LEADER_MODES = ("two_pass", "single_pass")
+LEADER_MODE = os.getenv("LEADER_MODE", "two_pass").strip().lower() or "two_pass"
+
+# Seconds each graph node may run (NODE_TIMEOUT_<NODE>, 0 for no limit) and the whole
+# turn may take. A supporting node past its limit is dropped and the result marked partial.
+DEFAULT_NODE_TIMEOUTS = {
+    "leader_parse": 30.0,
+    "leader_response": 30.0,
+    "definer": 20.0,
+    "redditor": 25.0,
+    "engager": 20.0,
+    "auditor": 30.0,
+}
+NODE_TIMEOUTS = {
+    node: float(os.getenv(f"NODE_TIMEOUT_{node.upper()}", str(default))) or None
+    for node, default in DEFAULT_NODE_TIMEOUTS.items()
+}
+ORCHESTRATION_DEADLINE = float(os.getenv("ORCHESTRATION_DEADLINE_SECONDS", "90")) or None
+# Model calls that raise are retried after a full-jitter exponential backoff.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+# Critical-path calls still running after this many seconds race a duplicate request; 0 disables.
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+HEDGED_NODES = frozenset({"leader_parse", "leader_response", "auditor"})
+
+# Awaited with an event name and payload as orchestration progresses (see arun_orchestration).
+EventCallback = Callable[[str, dict[str, Any]], Awaitable[None]]
 
 # Below are prompts for each node define their specific roles and expected JSON outputs, 
 # guiding them to process the user's input in a structured way while adhering 
@@ -81,6 +133,7 @@ AUDITOR_PROMPT = dedent(
     You are the Auditor node and are always active.
     Check for diagnosing language, treatment recommendations, probabilistic claims, and alarmist framing.
     Rewrite risky language safely.
+    "rule_matches" lists exact segments the rule checks already flagged; always address those.
     Return JSON ONLY:
     {
       "flagged_segments": ["string"],
@@ -106,6 +159,34 @@ LEADER_RESPONSE_PROMPT = dedent(
     """
 ).strip()
 
+SUMMARY_PROMPT = dedent(
+    """
+    You keep a running summary of a supportive conversation about the user's symptoms.
+    Merge the previous summary with the new messages into at most 10 short bullet points.
+    Keep symptoms, timing, impacts on daily life, questions already asked, and anything the user wants remembered.
+    Drop greetings and repetition. Do not diagnose or add information that was not said.
+    Return only the bullet points.
+    """
+).strip()
+
+
+class LeaderParse(BaseModel):
+    narrative_summary: str
+    candidate_symptoms: list[str]
+    questions_to_clarify: list[str]
+    research_keywords: list[str]
+    engagement_ready: bool
+    raw_symptom_phrases: list[str]
+    timeline_information: str
+    reported_impacts: list[str]
+    uncertainties: list[str]
+
+
+class LeaderTurn(LeaderParse):
+    """The single-pass leader output: the parse plus the reply shown to the user."""
+
+    response: str
+
 
 def available_agents() -> list[str]:
     return list(NODE_NAMES)
@@ -141,6 +222,14 @@ def _leader_prompt_for(active_agent: str) -> str:
     ).strip()
 
 
+def _leader_turn_prompt_for(active_agent: str) -> str:
+    return (
+        _leader_prompt_for(active_agent)
+        + '\nAlso fill "response" with your reply to the user, following these rules:\n'
+        + LEADER_RESPONSE_PROMPT
+    )
+
+
 def _load_key_from_dotenv(dotenv_path: Path) -> str | None:
     if not dotenv_path.exists():
         return None
@@ -157,7 +246,19 @@ def _load_key_from_dotenv(dotenv_path: Path) -> str | None:
     return None
 
 
-def _resolve_openai_api_key() -> str:
+_api_key: str | None = None
+_registry_lock = Lock()
+# Clients and compiled agent graphs are reused across requests so each node call
+# skips client construction, graph compilation and a fresh connection pool.
+_models: dict[str, BaseChatModel] = {}
+_agents: dict[tuple[str, str, tuple[str, ...]], Any] = {}
+_structured_models: dict[str, Any] = {}
+# model_name comes from the request, so cap how many distinct entries are kept.
+_MAX_CACHED_MODELS = 8
+_MAX_CACHED_AGENTS = 64
+
+
+def _read_openai_api_key() -> str:
     env_key = os.getenv("OPENAI_API_KEY", "").strip()
     if env_key:
         return env_key
@@ -178,10 +279,110 @@ def _resolve_openai_api_key() -> str:
     )
 
 
-def _make_model(model_name: str) -> ChatOpenAI:
+def _resolve_openai_api_key() -> str:
+    global _api_key
+    if _api_key is None:
+        _api_key = _read_openai_api_key()
+    return _api_key
+
+
+def invalidate_clients() -> None:
+    """Forget the cached API key, clients and agents, e.g. after rotating the key."""
+    global _api_key
+    with _registry_lock:
+        _api_key = None
+        _models.clear()
+        _agents.clear()
+        _structured_models.clear()
+
+
+def _make_openai_model(model_name: str) -> BaseChatModel:
     return ChatOpenAI(model=model_name, temperature=0.2, api_key=_resolve_openai_api_key())
 
 
+# Factories building the chat model for a model name; "fake" needs no API key or network.
+_providers: dict[str, Callable[[str], BaseChatModel]] = {
+    "openai": _make_openai_model,
+    "fake": FakeChatModel.from_env,
+}
+_provider = os.getenv("MODEL_PROVIDER", "openai").strip().lower() or "openai"
+
+
+def register_model_provider(name: str, factory: Callable[[str], BaseChatModel]) -> None:
+    with _registry_lock:
+        _providers[name] = factory
+
+
+def set_model_provider(name: str) -> None:
+    """Switch every node to the provider registered as ``name``."""
+    global _provider
+    if name not in _providers:
+        raise ValueError(f"model provider must be one of {sorted(_providers)}")
+    _provider = name
+    invalidate_clients()
+
+
+def model_provider() -> str:
+    return _provider
+
+
+def _make_model(model_name: str) -> BaseChatModel:
+    if _provider not in _providers:
+        raise ValueError(f"MODEL_PROVIDER must be one of {sorted(_providers)}")
+    return _providers[_provider](model_name)
+
+
+def _evict_oldest(cache: dict[Any, Any], keep: int) -> None:
+    while len(cache) > keep:
+        cache.pop(next(iter(cache)))
+
+
+def _get_model(model_name: str) -> BaseChatModel:
+    with _registry_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = _make_model(model_name)
+            _evict_oldest(_models, _MAX_CACHED_MODELS - 1)
+            _models[model_name] = model
+        return model
+
+
+def _get_agent(model_name: str, system_prompt: str, tools: list[Any]) -> Any:
+    key = (model_name, system_prompt, tuple(getattr(item, "name", repr(item)) for item in tools))
+    with _registry_lock:
+        agent = _agents.get(key)
+    if agent is not None:
+        return agent
+
+    agent = create_agent(_get_model(model_name), tools=tools, system_prompt=system_prompt)
+    with _registry_lock:
+        if key not in _agents:
+            _evict_oldest(_agents, _MAX_CACHED_AGENTS - 1)
+        return _agents.setdefault(key, agent)
+
+
+def _get_leader_turn_model(model_name: str) -> Any:
+    with _registry_lock:
+        structured = _structured_models.get(model_name)
+    if structured is not None:
+        return structured
+
+    structured = _get_model(model_name).with_structured_output(
+        LeaderTurn, method="json_schema", strict=True, include_raw=True
+    )
+    with _registry_lock:
+        if model_name not in _structured_models:
+            _evict_oldest(_structured_models, _MAX_CACHED_MODELS - 1)
+        return _structured_models.setdefault(model_name, structured)
+
+
+def _leader_turn_text(result: dict[str, Any]) -> str:
+    parsed = result.get("parsed")
+    if result.get("parsing_error") is not None or not isinstance(parsed, LeaderTurn):
+        raise ValueError(f"leader turn did not match the schema: {result.get('parsing_error')}")
+    return parsed.model_dump_json()
+
+
 def _extract_text(result: dict[str, Any]) -> str:
     message = result["messages"][-1]
     text = getattr(message, "text", None)
@@ -215,31 +416,238 @@ def _parse_json(text: str, fallback: dict[str, Any]) -> dict[str, Any]:
     return fallback
 
 
-def _build_message(history: list[dict[str, str]], payload: dict[str, Any]) -> str:
-    history_text = "\n".join(f"{item.get('role', 'user')}: {item.get('content', '')}" for item in history[-8:])
-    return dedent(
-        f"""
-        Conversation history:
-        {history_text if history_text else "(none)"}
-
-        Payload JSON:
-        {json.dumps(payload, ensure_ascii=True)}
-        """
-    ).strip()
+def _build_message(history: list[dict[str, str]], payload: dict[str, Any], summary: str | None = None) -> str:
+    return render_message(history[-HISTORY_WINDOW:], payload, summary)
 
 
 @tool
 def subreddit_search(query: str, limit: int = 5) -> str:
     """Search local subreddit index for relevant threads."""
-    return json.dumps(search_posts(query, limit=limit), ensure_ascii=True)
+    try:
+        return json.dumps(search_posts(query, limit=limit), ensure_ascii=True)
+    except SearchIndexUnavailable as exc:
+        return json.dumps({"error": str(exc)}, ensure_ascii=True)
 
 
 def _invoke_node(system_prompt: str, model_name: str, user_content: str, tools: list[Any] | None = None) -> str:
-    agent = create_agent(_make_model(model_name), tools=tools or [], system_prompt=system_prompt)
+    agent = _get_agent(model_name, system_prompt, tools or [])
     result = agent.invoke({"messages": [{"role": "user", "content": user_content}]})
     return _extract_text(result)
 
 
+async def _ainvoke_node(
+    system_prompt: str,
+    model_name: str,
+    user_content: str,
+    tools: list[Any] | None = None,
+    on_token: Callable[[str], Awaitable[None]] | None = None,
+) -> str:
+    if on_token is not None:
+        return await _astream_node(system_prompt, model_name, user_content, on_token)
+    agent = _get_agent(model_name, system_prompt, tools or [])
+    result = await agent.ainvoke({"messages": [{"role": "user", "content": user_content}]})
+    return _extract_text(result)
+
+
+async def _astream_node(
+    system_prompt: str,
+    model_name: str,
+    user_content: str,
+    on_token: Callable[[str], Awaitable[None]],
+) -> str:
+    agent = _get_agent(model_name, system_prompt, [])
+    chunks: list[str] = []
+    async for message, _ in agent.astream(
+        {"messages": [{"role": "user", "content": user_content}]},
+        stream_mode="messages",
+    ):
+        if not isinstance(message, AIMessageChunk):
+            continue
+        text = message.text
+        if text:
+            chunks.append(text)
+            await on_token(text)
+    return "".join(chunks)
+
+
+def _invoke_leader_turn(system_prompt: str, model_name: str, user_content: str) -> str:
+    messages = [("system", system_prompt), ("user", user_content)]
+    return _leader_turn_text(_get_leader_turn_model(model_name).invoke(messages))
+
+
+async def _ainvoke_leader_turn(system_prompt: str, model_name: str, user_content: str) -> str:
+    """Both leader outputs from one structured-output call, as ``LeaderTurn`` JSON.
+
+    Raises ValueError when the reply does not match the schema.
+    """
+    messages = [("system", system_prompt), ("user", user_content)]
+    return _leader_turn_text(await _get_leader_turn_model(model_name).ainvoke(messages))
+
+
+async def _invoke_leader_turn_in_thread(system_prompt: str, model_name: str, user_content: str) -> str:
+    return await asyncio.to_thread(_invoke_leader_turn, system_prompt, model_name, user_content)
+
+
+async def _invoke_node_in_thread(
+    system_prompt: str,
+    model_name: str,
+    user_content: str,
+    tools: list[Any] | None = None,
+) -> str:
+    # Used by the sync entry point: each asyncio.run() has its own event loop, and the
+    # clients' pooled async connections must not be shared across loops.
+    return await asyncio.to_thread(_invoke_node, system_prompt, model_name, user_content, tools)
+
+
+async def _hedged(call: Callable[[], Awaitable[str]], delay: float) -> tuple[str, str | None]:
+    """Await ``call()``, racing a second copy if the first is still running after ``delay``.
+
+    Returns the text and which call produced it: ``None`` when no hedge was sent,
+    otherwise ``"primary"`` or ``"hedge"``. The loser is cancelled.
+    """
+    tasks = {asyncio.ensure_future(call()): "primary"}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return done.pop().result(), None
+        tasks[asyncio.ensure_future(call())] = "hedge"
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # exception() on every finished task, so a failed one is never left unretrieved.
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0].result(), tasks[succeeded[0]]
+            if not pending:
+                return done.pop().result(), None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _resilient_invoke(
+    node: str,
+    invoke: Callable[..., Awaitable[str]],
+    report: dict[str, dict[str, Any]],
+) -> Callable[..., Awaitable[str]]:
+    """Wrap ``invoke`` with jittered retries and, for ``HEDGED_NODES``, hedged requests.
+
+    Retries and hedge winners are recorded per node in ``report["retries"]`` and
+    ``report["hedged"]``. A streamed call is never hedged, nor retried once tokens went out.
+    """
+    hedge = node in HEDGED_NODES and LLM_HEDGE_AFTER > 0
+
+    async def call(system_prompt: str, model_name: str, user_content: str, **kwargs: Any) -> str:
+        on_token = kwargs.get("on_token")
+        streamed = False
+        if on_token is not None:
+
+            async def forward(text: str) -> None:
+                nonlocal streamed
+                streamed = True
+                await on_token(text)
+
+            kwargs["on_token"] = forward
+
+        async def attempt() -> str:
+            if not hedge or on_token is not None:
+                return await invoke(system_prompt, model_name, user_content, **kwargs)
+            text, winner = await _hedged(
+                lambda: invoke(system_prompt, model_name, user_content, **kwargs), LLM_HEDGE_AFTER
+            )
+            if winner is not None:
+                report["hedged"][node] = winner
+                LLM_HEDGES.inc(node=node, winner=winner)
+            return text
+
+        retries = 0
+        while True:
+            try:
+                return await attempt()
+            except Exception:
+                if retries >= LLM_MAX_RETRIES or streamed:
+                    raise
+            retries += 1
+            report["retries"][node] = retries
+            LLM_RETRY_COUNT.inc(node=node)
+            await asyncio.sleep(random.uniform(0, LLM_RETRY_BACKOFF * 2 ** (retries - 1)))
+
+    return call
+
+
+def _cached_invoke(
+    node: str,
+    invoke: Callable[..., Awaitable[str]],
+    use_cache: bool,
+    report: dict[str, str],
+) -> Callable[..., Awaitable[str]]:
+    """Wrap ``invoke`` with the node response cache, recording hit/miss/bypass per node in ``report``."""
+
+    async def call(
+        system_prompt: str,
+        model_name: str,
+        user_content: str,
+        tools: list[Any] | None = None,
+        on_token: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
+        kwargs: dict[str, Any] = {}
+        if tools:
+            kwargs["tools"] = tools
+        if on_token is not None:
+            kwargs["on_token"] = on_token
+
+        async def call_model() -> str:
+            with span("llm", LLM_CALL_DURATION, node=node, cache=report[node]):
+                text = await invoke(system_prompt, model_name, user_content, **kwargs)
+            LLM_TOKENS.inc(count_tokens(system_prompt) + count_tokens(user_content), node=node, kind="prompt")
+            LLM_TOKENS.inc(count_tokens(text), node=node, kind="completion")
+            return text
+
+        cache = get_node_cache() if use_cache else None
+        if cache is None:
+            report[node] = "bypass"
+            return await call_model()
+
+        def key() -> str:
+            # Keyed by provider too, so fake replies never answer for a real model. Tool
+            # results come from the search index, so a reloaded corpus gets fresh entries.
+            model_key = f"{_provider}:{model_name}"
+            if tools:
+                model_key += f":index={index_version()}"
+            return cache_key(model_key, system_prompt, user_content)
+
+        # The persistent tier does file I/O, so keep lookups off the event loop.
+        text = await asyncio.to_thread(cache.get, key())
+        record_lookup(node, text is not None)
+        if text is not None:
+            report[node] = "hit"
+            if on_token is not None:
+                await on_token(text)
+            return text
+
+        report[node] = "miss"
+        text = await call_model()
+        if text.strip():
+            # Re-keyed after the call: the first tool call may have loaded (or reloaded) the index.
+            await asyncio.to_thread(cache.set, key(), text)
+        return text
+
+    return call
+
+
+async def summarize_history(
+    model_name: str,
+    previous_summary: str | None,
+    messages: list[dict[str, Any]],
+) -> str:
+    transcript = "\n".join(f"{item.get('role', 'user')}: {item.get('content', '')}" for item in messages)
+    request = (
+        f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}"
+    )
+    return (await _ainvoke_node(SUMMARY_PROMPT, model_name, request)).strip()
+
+
 def _dedupe_lines(lines: list[str]) -> list[str]:
     seen: set[str] = set()
     deduped: list[str] = []
@@ -270,21 +678,24 @@ def _should_run_engager(message: str, leader_output: dict[str, Any]) -> bool:
     return any(trigger in text for trigger in triggers)
 
 
-def _build_leader_response(
+async def _build_leader_response(
     model_name: str,
     message: str,
-    conversation_history: list[dict[str, str]],
     leader_output: dict[str, Any],
+    build_request: Callable[[dict[str, Any]], str],
+    invoke: Callable[..., Awaitable[str]] = _ainvoke_node,
+    on_token: Callable[[str], Awaitable[None]] | None = None,
 ) -> str:
-    request = _build_message(
-        conversation_history,
+    request = build_request(
         {
             "user_prompt": message,
             "leader_output": leader_output,
             "task": "Respond to the user directly as the leader assistant",
-        },
+        }
     )
-    return _invoke_node(LEADER_RESPONSE_PROMPT, model_name, request)
+    if on_token is not None:
+        return await invoke(LEADER_RESPONSE_PROMPT, model_name, request, on_token=on_token)
+    return await invoke(LEADER_RESPONSE_PROMPT, model_name, request)
 
 
 def _aggregate_outputs(
@@ -340,21 +751,33 @@ def _aggregate_outputs(
     return "\n".join(_dedupe_lines(lines))
 
 
-def _rule_based_audit(text: str) -> list[str]:
-    checks = [
-        r"\byou (have|likely have|definitely have)\b",
-        r"\bdiagnos(is|e|ed)\b",
-        r"\bcure\b",
-        r"\bguarantee(d)?\b",
-        r"\b\d{1,3}%\b",
-        r"\bmust take\b",
-    ]
-    flags: list[str] = []
-    lowered = text.lower()
-    for pattern in checks:
-        if re.search(pattern, lowered):
-            flags.append(f"Matched risky pattern: {pattern}")
-    return flags
+def _rule_based_audit(text: str) -> list[RuleMatch]:
+    return get_rule_engine().scan(text)
+
+
+def _thread_summaries(node_outputs: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    threads = node_outputs.get("redditor", {}).get("relevant_threads", [])
+    return [item for item in threads if isinstance(item, dict)] if isinstance(threads, list) else []
+
+
+def _degraded_report(
+    errors: dict[str, BaseException],
+    call_report: dict[str, dict[str, Any]],
+    nodes: list[str] | None = None,
+) -> dict[str, Any]:
+    """Nodes that timed out or failed, plus the retries and hedges of ``nodes`` (default: all)."""
+    return {
+        "timed_out": sorted(name for name, exc in errors.items() if isinstance(exc, TimeoutError)),
+        "failed": {name: type(exc).__name__ for name, exc in errors.items() if not isinstance(exc, TimeoutError)},
+        **{
+            kind: {node: value for node, value in by_node.items() if nodes is None or node in nodes}
+            for kind, by_node in call_report.items()
+        },
+    }
+
+
+def _rule_flags(matches: list[RuleMatch]) -> list[str]:
+    return _dedupe_lines([f'Matched {match.category} rule {match.rule_id}: "{match.text}"' for match in matches])
 
 
 def run_orchestration(
@@ -364,72 +787,208 @@ def run_orchestration(
     active_agent: str,
     enabled_agents: list[str],
     search_query: str | None = None,
+    use_cache: bool = True,
+    history_summary: str | None = None,
+    leader_mode: str | None = None,
+    audit_mode: str | None = None,
 ) -> dict[str, Any]:
-    if active_agent not in NODE_NAMES:
-        raise ValueError(f"Unknown leader node: {active_agent}")
+    # Always inline: background jobs could not outlive this call's event loop anyway. The
+    # drains below make sure nothing started on the loop is dropped when asyncio.run() closes it.
+    async def run() -> dict[str, Any]:
+        result = await arun_orchestration(
+            message=message,
+            model_name=model_name,
+            conversation_history=conversation_history,
+            active_agent=active_agent,
+            enabled_agents=enabled_agents,
+            search_query=search_query,
+            invoke=_invoke_node_in_thread,
+            use_cache=use_cache,
+            history_summary=history_summary,
+            leader_mode=leader_mode,
+            invoke_leader_turn=_invoke_leader_turn_in_thread,
+            audit_mode=audit_mode,
+            supporting_mode="inline",
+        )
+        await drain_deferred_audits()
+        await drain_supporting_jobs()
+        return result
 
-    leader_payload = {"user_prompt": message}
-    leader_request = _build_message(conversation_history, leader_payload)
-    leader_text = _invoke_node(_leader_prompt_for(active_agent), model_name, leader_request)
-    leader_output = _parse_json(
-        leader_text,
-        {
-            "narrative_summary": leader_text.strip(),
-            "candidate_symptoms": [],
-            "questions_to_clarify": [],
-            "research_keywords": [],
-            "engagement_ready": False,
-            "raw_symptom_phrases": [],
-            "timeline_information": "",
-            "reported_impacts": [],
-            "uncertainties": [],
-        },
-    )
-    leader_response = _build_leader_response(model_name, message, conversation_history, leader_output)
+    return asyncio.run(run())
 
-    selected_supporting_nodes = _normalize_enabled_agents(active_agent, enabled_agents)
-    if "engager" in selected_supporting_nodes and not _should_run_engager(message, leader_output):
-        selected_supporting_nodes = [name for name in selected_supporting_nodes if name != "engager"]
 
-    node_outputs: dict[str, dict[str, Any]] = {}
-    thread_summaries: list[dict[str, Any]] = []
+async def arun_orchestration(
+    message: str,
+    model_name: str,
+    conversation_history: list[dict[str, str]],
+    active_agent: str,
+    enabled_agents: list[str],
+    search_query: str | None = None,
+    invoke: Callable[..., Awaitable[str]] = _ainvoke_node,
+    on_event: EventCallback | None = None,
+    use_cache: bool = True,
+    history_summary: str | None = None,
+    leader_mode: str | None = None,
+    invoke_leader_turn: Callable[..., Awaitable[str]] = _ainvoke_leader_turn,
+    audit_mode: str | None = None,
+    on_deferred_audit: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    deadline: float | None = None,
+    supporting_mode: str | None = None,
+    on_supporting_result: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+) -> dict[str, Any]:
+    """Run the node graph for one chat turn.
+
+    With ``on_event`` the leader response is streamed and progress is reported as
+    ``leader_output``, ``leader_token`` (``text``), ``leader_response``, ``node``
+    (``agent``, ``output``) and ``audit`` (``audit_output``, ``response``) events.
+    ``use_cache=False`` skips the node response cache for this turn. ``history_summary``
+    (the session's compacted earlier turns) is prepended to every node prompt.
+    ``leader_mode`` (default ``LEADER_MODE``) set to ``single_pass`` gets the leader parse
+    and response from one structured call, falling back to two calls if that fails.
+    ``audit_mode`` (default ``AUDIT_MODE``) decides when the LLM auditor can be skipped,
+    sampled or deferred; a deferred audit's output is passed to ``on_deferred_audit``.
+    Nodes run under ``NODE_TIMEOUTS`` and the whole graph under ``deadline`` (default
+    ``ORCHESTRATION_DEADLINE``); supporting nodes that time out or fail are left out and
+    listed under ``degraded``, and a required node that does raises TimeoutError.
+    ``supporting_mode`` (default ``SUPPORTING_MODE``) set to ``background`` audits and
+    returns the leader response alone; the supporting nodes and their own audit run as a
+    background job whose output (the supporting keys of this result, plus ``status``) is
+    passed to ``on_supporting_result``.
+    """
+    if active_agent not in NODE_NAMES:
+        raise ValueError(f"Unknown leader node: {active_agent}")
+    leader_mode = leader_mode or LEADER_MODE
+    if leader_mode not in LEADER_MODES:
+        raise ValueError(f"leader_mode must be one of {list(LEADER_MODES)}")
+    audit_mode = audit_mode or AUDIT_MODE
+    deadline = deadline or ORCHESTRATION_DEADLINE
+    supporting_mode = supporting_mode or SUPPORTING_MODE
+    if supporting_mode not in SUPPORTING_MODES:
+        raise ValueError(f"supporting_mode must be one of {list(SUPPORTING_MODES)}")
+
+    cache_report: dict[str, str] = {}
+    prompt_report: dict[str, dict[str, Any]] = {}
+    call_report: dict[str, dict[str, Any]] = {"retries": {}, "hedged": {}}
+
+    def node_request(node: str, system_prompt: str, payload: dict[str, Any]) -> str:
+        fitted = fit_prompt(conversation_history[-HISTORY_WINDOW:], payload, NODE_BUDGETS[node], history_summary)
+        prompt_report[node] = {
+            "prompt_tokens": count_tokens(system_prompt) + fitted.tokens,
+            "message_tokens": fitted.tokens,
+            "budget": fitted.budget,
+            "dropped_history": fitted.dropped_history,
+            "truncations": fitted.truncations,
+        }
+        return fitted.text
+
+    def invoker(node: str) -> Callable[..., Awaitable[str]]:
+        return _cached_invoke(node, _resilient_invoke(node, invoke, call_report), use_cache, cache_report)
+
+    enabled_supporting_nodes = _normalize_enabled_agents(active_agent, enabled_agents)
+    background_nodes = enabled_supporting_nodes if supporting_mode == "background" else []
+    inline_nodes = [name for name in enabled_supporting_nodes if name not in background_nodes]
+    background_job: list[asyncio.Task[None]] = []
+    # Set when the single-pass call succeeds; leader_response then has nothing left to call.
+    single_pass: dict[str, str] = {}
+    leader_report: dict[str, Any] = {"mode": leader_mode, "calls": 0}
+
+    async def run_leader_turn() -> dict[str, Any] | None:
+        turn_prompt = _leader_turn_prompt_for(active_agent)
+        request = node_request("leader_turn", turn_prompt, {"user_prompt": message})
+        invoke_turn = _cached_invoke("leader_turn", invoke_leader_turn, use_cache, cache_report)
+        leader_report["calls"] += 1
+        try:
+            turn = json.loads(await invoke_turn(turn_prompt, model_name, request))
+        except Exception as exc:
+            leader_report["fallback"] = type(exc).__name__
+            return None
+        single_pass["response"] = str(turn.pop("response"))
+        return turn
+
+    async def run_leader_parse(_: dict[str, Any]) -> dict[str, Any]:
+        if leader_mode == "single_pass":
+            turn = await run_leader_turn()
+            if turn is not None:
+                return turn
+        leader_report["calls"] += 1
+        leader_prompt = _leader_prompt_for(active_agent)
+        leader_request = node_request("leader_parse", leader_prompt, {"user_prompt": message})
+        leader_text = await invoker("leader_parse")(leader_prompt, model_name, leader_request)
+        return _parse_json(
+            leader_text,
+            {
+                "narrative_summary": leader_text.strip(),
+                "candidate_symptoms": [],
+                "questions_to_clarify": [],
+                "research_keywords": [],
+                "engagement_ready": False,
+                "raw_symptom_phrases": [],
+                "timeline_information": "",
+                "reported_impacts": [],
+                "uncertainties": [],
+            },
+        )
+
+    async def emit_token(text: str) -> None:
+        await on_event("leader_token", {"text": text})
+
+    async def run_leader_response(inputs: dict[str, Any]) -> str:
+        if "response" in single_pass:
+            if on_event is not None:
+                await emit_token(single_pass["response"])
+            return single_pass["response"]
+        leader_report["calls"] += 1
+        return await _build_leader_response(
+            model_name,
+            message,
+            inputs["leader_parse"],
+            lambda payload: node_request("leader_response", LEADER_RESPONSE_PROMPT, payload),
+            invoker("leader_response"),
+            on_token=emit_token if on_event is not None else None,
+        )
 
-    def run_definer() -> tuple[str, dict[str, Any]]:
-        request = _build_message(
-            conversation_history,
+    async def run_definer(inputs: dict[str, Any]) -> dict[str, Any]:
+        request = node_request(
+            "definer",
+            DEFINER_PROMPT,
             {
-                "leader_output": leader_output,
+                "leader_output": select_leader_fields("definer", inputs["leader_parse"]),
                 "task": "standardize symptom terms and define them plainly",
             },
         )
-        text = _invoke_node(DEFINER_PROMPT, model_name, request)
-        return "definer", _parse_json(text, {"standardized_symptom_list": [], "definitions": [], "evidence_mapping": []})
+        text = await invoker("definer")(DEFINER_PROMPT, model_name, request)
+        return _parse_json(text, {"standardized_symptom_list": [], "definitions": [], "evidence_mapping": []})
 
-    def run_redditor() -> tuple[str, dict[str, Any]]:
+    async def run_redditor(inputs: dict[str, Any]) -> dict[str, Any]:
+        leader_output = inputs["leader_parse"]
         keywords = leader_output.get("research_keywords", [])
         query = search_query or (" ".join(str(item) for item in keywords if str(item).strip()) or message)
-        request = _build_message(
-            conversation_history,
+        request = node_request(
+            "redditor",
+            REDDITOR_PROMPT,
             {
-                "leader_output": leader_output,
+                "leader_output": select_leader_fields("redditor", leader_output),
                 "search_query": query,
                 "task": "find relevant discussion threads and summarize relevance",
             },
         )
-        text = _invoke_node(REDDITOR_PROMPT, model_name, request, tools=[subreddit_search])
-        parsed = _parse_json(text, {"relevant_threads": [], "subreddit_metadata": []})
-        return "redditor", parsed
-
-    def run_engager() -> tuple[str, dict[str, Any]]:
-        request = _build_message(
-            conversation_history,
+        text = await invoker("redditor")(REDDITOR_PROMPT, model_name, request, tools=[subreddit_search])
+        return _parse_json(text, {"relevant_threads": [], "subreddit_metadata": []})
+
+    async def run_engager(inputs: dict[str, Any]) -> dict[str, Any] | None:
+        leader_output = inputs["leader_parse"]
+        if not _should_run_engager(message, leader_output):
+            return None
+        request = node_request(
+            "engager",
+            ENGAGER_PROMPT,
             {
-                "leader_output": leader_output,
+                "leader_output": select_leader_fields("engager", leader_output),
                 "task": "draft a respectful post and medical appointment questions",
             },
         )
-        text = _invoke_node(ENGAGER_PROMPT, model_name, request)
-        parsed = _parse_json(
+        text = await invoker("engager")(ENGAGER_PROMPT, model_name, request)
+        return _parse_json(
             text,
             {
                 "draft_message": text.strip(),
@@ -437,58 +996,168 @@ def run_orchestration(
                 "questions_for_medical_professional": [],
             },
         )
-        return "engager", parsed
 
-    workers: dict[str, Any] = {
+    async def audit(aggregated_output: str, node: str = "auditor") -> tuple[dict[str, Any], str]:
+        rule_matches = _rule_based_audit(aggregated_output)
+        rule_flags = _rule_flags(rule_matches)
+        match_dicts = [match.as_dict() for match in rule_matches]
+
+        async def llm_audit() -> dict[str, Any]:
+            audit_request = node_request(
+                node,
+                AUDITOR_PROMPT,
+                {
+                    "aggregated_output": aggregated_output,
+                    "rule_matches": [
+                        {"text": match.text, "category": match.category, "severity": match.severity}
+                        for match in rule_matches
+                    ],
+                    "required_constraints": [
+                        "No diagnosis",
+                        "No treatment prescription",
+                        "No probabilistic certainty",
+                        "No alarmist framing",
+                    ],
+                },
+            )
+            audit_text = await invoker(node)(AUDITOR_PROMPT, model_name, audit_request)
+            audit_output = _parse_json(
+                audit_text,
+                {
+                    "flagged_segments": [],
+                    "revision_suggestions": [],
+                    "safe_output": aggregated_output,
+                },
+            )
+
+            combined_flags = []
+            combined_flags.extend(str(item) for item in audit_output.get("flagged_segments", []) if str(item).strip())
+            combined_flags.extend(rule_flags)
+            audit_output["flagged_segments"] = _dedupe_lines(combined_flags)
+            audit_output["rule_matches"] = match_dicts
+            return audit_output
+
+        audit_path = choose_audit_path(rule_flags, aggregated_output, audit_mode)
+        record_audit_path(audit_path)
+        if audit_path in {"skipped", "deferred"}:
+            if audit_path == "deferred":
+                schedule_deferred_audit(llm_audit(), on_deferred_audit)
+            audit_output = {
+                "flagged_segments": [],
+                "revision_suggestions": [],
+                "safe_output": aggregated_output,
+                "rule_matches": match_dicts,
+            }
+        else:
+            audit_output = await llm_audit()
+            if audit_path == "sampled":
+                record_clean_check(bool(audit_output["flagged_segments"]))
+        return audit_output, audit_path
+
+    async def run_auditor(inputs: dict[str, Any]) -> dict[str, Any]:
+        node_outputs = {name: inputs[name] for name in inline_nodes if isinstance(inputs.get(name), dict)}
+        aggregated_output = _aggregate_outputs(inputs["leader_response"], inputs["leader_parse"], node_outputs)
+        audit_output, audit_path = await audit(aggregated_output)
+        return {"aggregated_output": aggregated_output, "audit_output": audit_output, "audit_path": audit_path}
+
+    workers = {
         "definer": run_definer,
         "redditor": run_redditor,
         "engager": run_engager,
     }
 
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = [executor.submit(workers[name]) for name in selected_supporting_nodes if name in workers]
-        for future in futures:
-            try:
-                name, parsed = future.result()
-            except Exception:
-                continue
-            else:
-                node_outputs[name] = parsed
-                if name == "redditor":
-                    threads = parsed.get("relevant_threads", [])
-                    if isinstance(threads, list):
-                        thread_summaries = [item for item in threads if isinstance(item, dict)]
-
-    aggregated_output = _aggregate_outputs(leader_response, leader_output, node_outputs)
-    rule_flags = _rule_based_audit(aggregated_output)
-
-    audit_request = _build_message(
-        conversation_history,
-        {
-            "aggregated_output": aggregated_output,
-            "required_constraints": [
-                "No diagnosis",
-                "No treatment prescription",
-                "No probabilistic certainty",
-                "No alarmist framing",
+    async def run_background(leader_output: dict[str, Any]) -> dict[str, Any]:
+        inputs = {"leader_parse": leader_output}
+        outcome = await run_graph(
+            [
+                GraphNode(name, lambda _, worker=workers[name]: worker(inputs), timeout=NODE_TIMEOUTS[name])
+                for name in background_nodes
             ],
-        },
-    )
-    audit_text = _invoke_node(AUDITOR_PROMPT, model_name, audit_request)
-    audit_output = _parse_json(
-        audit_text,
-        {
-            "flagged_segments": [],
-            "revision_suggestions": [],
-            "safe_output": aggregated_output,
-        },
-    )
+            deadline=deadline,
+        )
+        selected = [name for name in background_nodes if outcome.results.get(name) is not None]
+        node_outputs = {name: outcome.results[name] for name in selected if isinstance(outcome.results[name], dict)}
+        # The leader response was audited with the turn; this audit covers what the nodes add.
+        aggregated_output = _aggregate_outputs("", leader_output, node_outputs)
+        audit_output, audit_path = await audit(aggregated_output, "supporting_auditor")
+        return {
+            "supporting_outputs": node_outputs,
+            "selected_supporting_nodes": selected,
+            "thread_summaries": _thread_summaries(node_outputs),
+            "aggregated_output": aggregated_output,
+            "audit_output": audit_output,
+            "audit_path": audit_path,
+            "node_timings": outcome.timings,
+            "partial": bool(outcome.errors),
+            "degraded": _degraded_report(outcome.errors, call_report, background_nodes),
+        }
+
+    async def run_leader_parse_and_dispatch(inputs: dict[str, Any]) -> dict[str, Any]:
+        leader_output = await run_leader_parse(inputs)
+        if background_nodes:
+            background_job.append(
+                schedule_supporting_job(lambda: run_background(leader_output), on_supporting_result)
+            )
+        return leader_output
+
+    # The leader response and the supporting nodes only need the parsed leader output,
+    # so they all start together as soon as it is ready.
+    graph = [
+        GraphNode(
+            "leader_parse", run_leader_parse_and_dispatch, required=True, timeout=NODE_TIMEOUTS["leader_parse"]
+        ),
+        GraphNode(
+            "leader_response",
+            run_leader_response,
+            deps=("leader_parse",),
+            required=True,
+            timeout=NODE_TIMEOUTS["leader_response"],
+        ),
+        *[
+            GraphNode(name, workers[name], deps=("leader_parse",), timeout=NODE_TIMEOUTS[name])
+            for name in inline_nodes
+        ],
+        GraphNode(
+            "auditor",
+            run_auditor,
+            deps=("leader_response", *inline_nodes),
+            required=True,
+            timeout=NODE_TIMEOUTS["auditor"],
+        ),
+    ]
+
+    async def node_completed(name: str, result: Any) -> None:
+        if name == "leader_parse":
+            await on_event("leader_output", {"leader_output": result})
+        elif name == "leader_response":
+            await on_event("leader_response", {"text": result})
+        elif name == "auditor":
+            audit_output = result["audit_output"]
+            response = str(audit_output.get("safe_output", "")).strip() or result["aggregated_output"]
+            await on_event("audit", {"audit_output": audit_output, "response": response})
+        elif result is not None:
+            await on_event("node", {"agent": name, "output": result})
 
-    combined_flags = []
-    combined_flags.extend(str(item) for item in audit_output.get("flagged_segments", []) if str(item).strip())
-    combined_flags.extend(rule_flags)
-    audit_output["flagged_segments"] = _dedupe_lines(combined_flags)
+    try:
+        with span("orchestration", ORCHESTRATION_DURATION):
+            outcome = await run_graph(
+                graph, on_complete=node_completed if on_event is not None else None, deadline=deadline
+            )
+    except BaseException:
+        # Nobody will ask for the supporting results of a turn that failed.
+        for task in background_job:
+            task.cancel()
+        raise
+
+    leader_output = outcome.results["leader_parse"]
+    leader_response = outcome.results["leader_response"]
+    selected_supporting_nodes = [name for name in inline_nodes if outcome.results.get(name) is not None]
+    node_outputs: dict[str, dict[str, Any]] = {
+        name: outcome.results[name] for name in selected_supporting_nodes if isinstance(outcome.results.get(name), dict)
+    }
 
+    aggregated_output = outcome.results["auditor"]["aggregated_output"]
+    audit_output = outcome.results["auditor"]["audit_output"]
     safe_output = str(audit_output.get("safe_output", "")).strip() or aggregated_output
     return {
         "response": safe_output,
@@ -498,5 +1167,13 @@ def run_orchestration(
         "aggregated_output": aggregated_output,
         "audit_output": audit_output,
         "selected_supporting_nodes": selected_supporting_nodes,
-        "thread_summaries": thread_summaries,
+        "thread_summaries": _thread_summaries(node_outputs),
+        "node_timings": outcome.timings,
+        "cache": cache_report,
+        "prompt_tokens": prompt_report,
+        "audit_path": outcome.results["auditor"]["audit_path"],
+        "leader": {**leader_report, "single_pass": "response" in single_pass},
+        "partial": bool(outcome.errors),
+        "degraded": _degraded_report(outcome.errors, call_report, [node.name for node in graph]),
+        "supporting": {"mode": supporting_mode, "pending": background_nodes},
     }
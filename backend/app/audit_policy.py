@@ -0,0 +1,93 @@
+import asyncio
+import os
+import random
+from collections.abc import Awaitable, Callable
+from threading import Lock
+from typing import Any
+
+AUDIT_MODES = ("always", "skip", "sample", "async")
+AUDIT_PATHS = ("flagged", "full", "sampled", "skipped", "deferred")
+
+# always: every turn waits for the LLM auditor (the original behaviour).
+# skip / sample / async: a turn the rules find clean and short enough skips the LLM audit,
+# runs it for a random AUDIT_SAMPLE_RATE share, or runs it after the response is returned.
+AUDIT_MODE = os.getenv("AUDIT_MODE", "always").strip().lower() or "always"
+FAST_PATH_MAX_CHARS = int(os.getenv("AUDIT_FAST_PATH_MAX_CHARS", "1200"))
+SAMPLE_RATE = float(os.getenv("AUDIT_SAMPLE_RATE", "0.1"))
+
+_state_lock = Lock()
+_background: set[asyncio.Task[Any]] = set()
+_counters: dict[str, int] = {path: 0 for path in AUDIT_PATHS}
+# LLM audits of rule-clean text (sampled or deferred) and how many of them still flagged something.
+_clean_checks = {"completed": 0, "flagged": 0, "failures": 0}
+
+
+def choose_audit_path(rule_flags: list[str], text: str, mode: str = AUDIT_MODE) -> str:
+    """Pick how to audit one turn; anything the rules flag always goes to the LLM."""
+    if mode not in AUDIT_MODES:
+        raise ValueError(f"audit mode must be one of {list(AUDIT_MODES)}")
+    if rule_flags:
+        return "flagged"
+    if mode == "always" or len(text) > FAST_PATH_MAX_CHARS:
+        return "full"
+    if mode == "sample":
+        return "sampled" if random.random() < SAMPLE_RATE else "skipped"
+    if mode == "async":
+        return "deferred"
+    return "skipped"
+
+
+def record_audit_path(path: str) -> None:
+    with _state_lock:
+        _counters[path] += 1
+
+
+def record_clean_check(flagged: bool) -> None:
+    with _state_lock:
+        _clean_checks["completed"] += 1
+        if flagged:
+            _clean_checks["flagged"] += 1
+
+
+async def _run_deferred(
+    audit: Awaitable[dict[str, Any]],
+    on_result: Callable[[dict[str, Any]], Awaitable[None]] | None,
+) -> None:
+    try:
+        audit_output = await audit
+        record_clean_check(bool(audit_output.get("flagged_segments")))
+        if on_result is not None:
+            await on_result(audit_output)
+    except Exception:
+        with _state_lock:
+            _clean_checks["failures"] += 1
+
+
+def schedule_deferred_audit(
+    audit: Awaitable[dict[str, Any]],
+    on_result: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+) -> None:
+    """Run ``audit`` in the background of the running loop, then pass its output to ``on_result``."""
+    task = asyncio.get_running_loop().create_task(_run_deferred(audit, on_result))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def drain_deferred_audits() -> None:
+    """Wait for the deferred audits started on this loop, e.g. before a short-lived loop closes."""
+    loop = asyncio.get_running_loop()
+    pending = [task for task in _background if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def audit_status() -> dict[str, Any]:
+    with _state_lock:
+        return {
+            "mode": AUDIT_MODE,
+            "fast_path_max_chars": FAST_PATH_MAX_CHARS,
+            "sample_rate": SAMPLE_RATE,
+            "paths": dict(_counters),
+            "clean_llm_checks": dict(_clean_checks),
+            "deferred_running": len(_background),
+        }
@@ -0,0 +1,228 @@
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+RULES_PATH = Path(
+    os.getenv("AUDIT_RULES_PATH", str(Path(__file__).resolve().parents[1] / "data" / "audit_rules.json"))
+)
+SEVERITIES = ("low", "medium", "high")
+# Patterns that can only match at the start of a word: "\b" followed by a word character,
+# \d, \w or a group whose alternatives all start with one.
+_WORD_START_PATTERN = re.compile(r"\\b(?:\w|\\[dw]|\(\?:\w[^|()]*(?:\|\w[^|()]*)*\))")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A safety rule: a regex ``pattern`` or a list of literal ``phrases`` (matched case-insensitively)."""
+
+    id: str
+    category: str
+    severity: str
+    pattern: str | None = None
+    phrases: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    rule_id: str
+    category: str
+    severity: str
+    start: int
+    end: int
+    text: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _normalize_phrase(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _trie_pattern(phrases: list[str]) -> str:
+    # Shared prefixes become one branch, so the regex engine steps through each phrase
+    # character by character instead of retrying every phrase at every position.
+    trie: dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict[str, Any]) -> str:
+        branches = [(r"\s+" if char == " " else re.escape(char)) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional tail: the longest phrase sharing this prefix wins.
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+def _only_at_word_start(pattern: str) -> bool:
+    if not _WORD_START_PATTERN.match(pattern):
+        return False
+    # A top-level "|" would let the other alternatives match anywhere.
+    depth = 0
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return False
+    return True
+
+
+def _unsupported_construct(pattern: str) -> str | None:
+    # Rules are also joined into one prefilter regex, where group numbers shift, group
+    # names can collide and a global inline flag would apply to every other rule.
+    escaped = in_class = False
+    for index, char in enumerate(pattern):
+        if escaped:
+            escaped = False
+            if char in "123456789" and not in_class:
+                return "numbered backreferences"
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif pattern.startswith("(?P", index):
+            return "named groups"
+        elif re.match(r"\(\?[aiLmsux]+\)", pattern[index:]):
+            return "global inline flags"
+    return None
+
+
+def parse_rules(data: dict[str, Any]) -> list[Rule]:
+    rules: list[Rule] = []
+    seen: set[str] = set()
+    for raw in data.get("rules", []):
+        rule_id = str(raw.get("id", "")).strip()
+        if not rule_id or rule_id in seen:
+            raise ValueError(f"audit rule ids must be unique and non-empty: {rule_id!r}")
+        seen.add(rule_id)
+        severity = str(raw.get("severity", "medium"))
+        if severity not in SEVERITIES:
+            raise ValueError(f"audit rule {rule_id!r}: severity must be one of {list(SEVERITIES)}")
+        pattern = raw.get("pattern")
+        phrases = tuple(_normalize_phrase(str(item)) for item in raw.get("phrases", []) if str(item).strip())
+        if bool(pattern) == bool(phrases):
+            raise ValueError(f"audit rule {rule_id!r} needs exactly one of 'pattern' or 'phrases'")
+        if pattern:
+            try:
+                compiled = re.compile(pattern)
+            except re.error as exc:
+                raise ValueError(f"audit rule {rule_id!r} has an invalid pattern: {exc}") from exc
+            unsupported = _unsupported_construct(pattern)
+            if unsupported:
+                raise ValueError(f"audit rule {rule_id!r}: {unsupported} are not supported in patterns")
+            if compiled.fullmatch(""):
+                raise ValueError(f"audit rule {rule_id!r}: pattern must not match the empty string")
+        rules.append(Rule(rule_id, str(raw.get("category", "general")), severity, pattern or None, phrases))
+    return rules
+
+
+def _phrase_pattern(phrases: list[str]) -> str:
+    word = [phrase for phrase in phrases if re.match(r"\w", phrase)]
+    other = [phrase for phrase in phrases if not re.match(r"\w", phrase)]
+    branches = ([rf"(?<!\w){_trie_pattern(word)}"] if word else []) + ([_trie_pattern(other)] if other else [])
+    return "(?:" + "|".join(branches) + r")(?!\w)"
+
+
+class RuleEngine:
+    """Every rule joined into one case-insensitive prefilter regex, then confirmed rule by rule.
+
+    The prefilter is a lookahead, so one pass finds every position where some rule
+    matches: literal phrases share one trie-shaped branch, and rules that can only match
+    at a word start sit behind one word-start check, so other positions cost a single
+    lookaround instead of one attempt per rule. At those few positions each rule is tried
+    with its own compiled pattern. Every rule reports its matches as if it scanned the
+    text alone, so matches of different rules can overlap or share a span.
+    """
+
+    def __init__(self, rules: list[Rule]) -> None:
+        self.rules = rules
+        self._compiled: list[tuple[Rule, re.Pattern[str]]] = []
+        word_start: list[str] = []
+        anywhere: list[str] = []
+        phrases = list(dict.fromkeys(phrase for rule in rules for phrase in rule.phrases))
+        word_phrases = [phrase for phrase in phrases if re.match(r"\w", phrase)]
+        other_phrases = [phrase for phrase in phrases if not re.match(r"\w", phrase)]
+        if word_phrases:
+            word_start.append(rf"{_trie_pattern(word_phrases)}(?!\w)")
+        if other_phrases:
+            anywhere.append(rf"{_trie_pattern(other_phrases)}(?!\w)")
+        for rule in rules:
+            if rule.pattern:
+                pattern = rule.pattern
+                if _only_at_word_start(pattern):
+                    word_start.append(f"(?:{pattern[2:]})")
+                else:
+                    anywhere.append(f"(?:{pattern})")
+            else:
+                pattern = _phrase_pattern(list(rule.phrases))
+            self._compiled.append((rule, re.compile(pattern, re.IGNORECASE)))
+        groups = anywhere
+        if word_start:
+            groups = [r"(?<!\w)(?=\w)(?:" + "|".join(word_start) + ")", *anywhere]
+        self._prefilter = re.compile("(?=" + "|".join(groups) + ")", re.IGNORECASE) if groups else None
+
+    @classmethod
+    def from_file(cls, path: str | Path = RULES_PATH) -> "RuleEngine":
+        return cls(parse_rules(json.loads(Path(path).read_text(encoding="utf-8"))))
+
+    def scan(self, text: str) -> list[RuleMatch]:
+        if self._prefilter is None:
+            return []
+        matches: list[RuleMatch] = []
+        # Like finditer per rule: a rule's next match starts after its previous one ends.
+        resume = [0] * len(self._compiled)
+        for candidate in self._prefilter.finditer(text):
+            start = candidate.start()
+            for index, (rule, regex) in enumerate(self._compiled):
+                if start < resume[index]:
+                    continue
+                found = regex.match(text, start)
+                if found is None or found.end() == start:
+                    continue
+                resume[index] = found.end()
+                matches.append(RuleMatch(rule.id, rule.category, rule.severity, start, found.end(), found.group()))
+        return matches
+
+
+_engine: RuleEngine | None = None
+_engine_lock = Lock()
+
+
+def get_rule_engine() -> RuleEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RuleEngine.from_file(RULES_PATH)
+        return _engine
+
+
+def reload_rules(path: str | Path = RULES_PATH) -> RuleEngine:
+    """Recompile from ``path``; the previous rules stay active if the file is invalid."""
+    global _engine
+    engine = RuleEngine.from_file(path)
+    with _engine_lock:
+        _engine = engine
+    return engine
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import re
+from threading import Lock
+from typing import Any
+
+from .agents import HISTORY_WINDOW, summarize_history
+from .store import SessionStore
+
+COMPACTION_MODES = ("extractive", "llm", "off")
+
+# Opt-in: compaction moves rows out of conversation_history, so sessions keep their full
+# history unless HISTORY_COMPACTION is set.
+COMPACTION_MODE = os.getenv("HISTORY_COMPACTION", "off").strip().lower() or "off"
+# Messages always left in the hot table; prompts only ever see HISTORY_WINDOW of them.
+KEEP_MESSAGES = int(os.getenv("HISTORY_KEEP_MESSAGES", str(HISTORY_WINDOW)))
+# Compact once this many older messages have piled up, so the summary (and any LLM call)
+# is refreshed every few turns rather than on every one.
+COMPACT_BATCH = int(os.getenv("HISTORY_COMPACT_BATCH", "16"))
+ARCHIVE_COMPACTED = os.getenv("HISTORY_ARCHIVE", "1").strip().lower() not in {"0", "false", "no"}
+SUMMARY_MAX_CHARS = int(os.getenv("HISTORY_SUMMARY_MAX_CHARS", "2000"))
+
+_state_lock = Lock()
+_running: set[str] = set()
+_background: set[asyncio.Task[Any]] = set()
+_status: dict[str, Any] = {
+    "compactions": 0,
+    "messages_compacted": 0,
+    "conflicts": 0,
+    "llm_fallbacks": 0,
+    "failures": 0,
+    "last_error": None,
+}
+
+
+def _sentences(text: str, count: int) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    picked = " ".join(re.split(r"(?<=[.!?])\s+", text)[:count])
+    return picked if len(picked) <= 240 else picked[:237].rstrip() + "..."
+
+
+def extractive_summary(previous_summary: str | None, messages: list[dict[str, Any]]) -> str:
+    """Fold messages into the summary as one line each, keeping the newest lines within SUMMARY_MAX_CHARS."""
+    lines = previous_summary.splitlines() if previous_summary else []
+    for message in messages:
+        role = str(message.get("role", "user"))
+        # The user's own words carry the symptoms; replies keep only their opening.
+        text = _sentences(str(message.get("content", "")), 2 if role == "user" else 1)
+        if text:
+            lines.append(f"- {role}: {text}")
+
+    kept: list[str] = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > SUMMARY_MAX_CHARS:
+            break
+        kept.append(line)
+    return "\n".join(reversed(kept))
+
+
+async def compact_session(
+    store: SessionStore,
+    session_id: str,
+    model_name: str = "gpt-4o-mini",
+    mode: str = COMPACTION_MODE,
+    keep: int = KEEP_MESSAGES,
+    batch: int = COMPACT_BATCH,
+    archive: bool = ARCHIVE_COMPACTED,
+) -> dict[str, Any] | None:
+    """Roll a session's older messages into its summary; returns what was compacted, or None."""
+    if mode not in COMPACTION_MODES:
+        raise ValueError(f"compaction mode must be one of {list(COMPACTION_MODES)}")
+    if mode == "off":
+        return None
+    with _state_lock:
+        if session_id in _running:
+            return None
+        _running.add(session_id)
+    try:
+        candidates = await asyncio.to_thread(store.compaction_candidates, session_id, keep)
+        if not candidates or len(candidates) < batch:
+            return None
+        previous = await asyncio.to_thread(store.get_summary, session_id)
+        previous_text = previous["summary"] if previous else None
+
+        summary = ""
+        if mode == "llm":
+            try:
+                summary = await summarize_history(model_name, previous_text, candidates)
+            except Exception:
+                with _state_lock:
+                    _status["llm_fallbacks"] += 1
+        if not summary:
+            summary = extractive_summary(previous_text, candidates)
+
+        through_id = candidates[-1]["id"]
+        applied = await asyncio.to_thread(
+            store.compact_history,
+            session_id,
+            summary,
+            through_id,
+            previous["through_id"] if previous else None,
+            archive,
+        )
+        with _state_lock:
+            if not applied:
+                _status["conflicts"] += 1
+                return None
+            _status["compactions"] += 1
+            _status["messages_compacted"] += len(candidates)
+        return {"session_id": session_id, "messages": len(candidates), "through_id": through_id, "mode": mode}
+    finally:
+        with _state_lock:
+            _running.discard(session_id)
+
+
+async def _compact_logged(store: SessionStore, session_id: str, model_name: str) -> None:
+    try:
+        await compact_session(store, session_id, model_name)
+    except Exception as exc:
+        with _state_lock:
+            _status["failures"] += 1
+            _status["last_error"] = f"{type(exc).__name__}: {exc}"
+
+
+def schedule_compaction(store: SessionStore, session_id: str, model_name: str) -> None:
+    """Compact in the background of the running event loop, off the request's critical path."""
+    if COMPACTION_MODE == "off":
+        return
+    task = asyncio.get_running_loop().create_task(_compact_logged(store, session_id, model_name))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def compaction_status() -> dict[str, Any]:
+    with _state_lock:
+        return {
+            "mode": COMPACTION_MODE,
+            "keep_messages": KEEP_MESSAGES,
+            "batch": COMPACT_BATCH,
+            "archive": ARCHIVE_COMPACTED,
+            "running": len(_running),
+            **_status,
+        }
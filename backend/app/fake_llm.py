@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator, Sequence
+from threading import Lock
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+SYMPTOM_TERMS = [
+    "cramps",
+    "fatigue",
+    "bloating",
+    "insomnia",
+    "migraine",
+    "headache",
+    "irritability",
+    "anxiety",
+    "mood swings",
+    "spotting",
+    "nausea",
+    "backache",
+    "breast tenderness",
+    "brain fog",
+]
+
+
+class FakeLLMError(RuntimeError):
+    pass
+
+
+def _payload(text: str) -> dict[str, Any]:
+    # Node messages end with the payload rendered by prompt_budget.render_message.
+    _, _, tail = text.rpartition("Payload JSON:")
+    try:
+        payload = json.loads(tail.strip())
+    except json.JSONDecodeError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _symptoms(text: str) -> list[str]:
+    lowered = text.lower()
+    found = [term for term in SYMPTOM_TERMS if term in lowered]
+    return found or [word for word in re.findall(r"[a-z]{5,}", lowered)[:2]]
+
+
+def _leader_parse(message: str) -> dict[str, Any]:
+    symptoms = _symptoms(message)
+    return {
+        "narrative_summary": message[:200],
+        "candidate_symptoms": symptoms,
+        "questions_to_clarify": [f"When does the {symptoms[0] if symptoms else 'discomfort'} usually start?"],
+        "research_keywords": symptoms[:3],
+        "engagement_ready": any(word in message.lower() for word in ("draft", "post", "write")),
+        "raw_symptom_phrases": symptoms,
+        "timeline_information": "",
+        "reported_impacts": [],
+        "uncertainties": [],
+    }
+
+
+def _leader_reply(message: str) -> str:
+    symptoms = _symptoms(message)
+    subject = ", ".join(symptoms[:3]) or "what you're going through"
+    return (
+        f"Thank you for sharing this. Dealing with {subject} can be exhausting. "
+        "Does it follow a pattern across your cycle, and how much does it affect your day?"
+    )
+
+
+def fake_reply(system_prompt: str, user_content: str) -> dict[str, Any] | str:
+    """The deterministic reply to a node prompt: a JSON-shaped dict, or prose for the leader response."""
+    payload = _payload(user_content)
+    leader = payload.get("leader_output") if isinstance(payload.get("leader_output"), dict) else {}
+    message = str(payload.get("user_prompt", user_content))
+    if "Leader Node" in system_prompt:
+        parsed = _leader_parse(message)
+        if '"response"' in system_prompt:
+            parsed["response"] = _leader_reply(message)
+        return parsed
+    if "leader assistant speaking directly" in system_prompt:
+        return _leader_reply(message)
+    if "Definer node" in system_prompt:
+        terms = [str(item) for item in leader.get("candidate_symptoms", [])][:3]
+        return {
+            "standardized_symptom_list": terms,
+            "definitions": [{"term": term, "definition": f"{term.capitalize()} as commonly described by patients."} for term in terms],
+            "evidence_mapping": [],
+        }
+    if "Redditor node" in system_prompt:
+        keywords = [str(item) for item in leader.get("research_keywords", [])][:2]
+        return {
+            "relevant_threads": [
+                {
+                    "title": f"Anyone else get {keyword} before their period?",
+                    "url": f"https://www.reddit.com/r/PMDD/comments/{hashlib.sha1(keyword.encode()).hexdigest()[:6]}",
+                    "summary": f"People comparing how they track {keyword}.",
+                    "score": 0.5,
+                }
+                for keyword in keywords
+            ],
+            "subreddit_metadata": ["r/PMDD"],
+        }
+    if "Engager node" in system_prompt:
+        summary = str(leader.get("narrative_summary", ""))[:120]
+        return {
+            "draft_message": f"Hi all, looking for experiences: {summary}",
+            "posting_guidelines": ["Avoid sharing identifying details."],
+            "questions_for_medical_professional": ["Could these symptoms be tracked together across my cycle?"],
+        }
+    if "Auditor node" in system_prompt:
+        return {"flagged_segments": [], "revision_suggestions": [], "safe_output": str(payload.get("aggregated_output", ""))}
+    if "running summary" in system_prompt:
+        return "- " + user_content.strip().splitlines()[-1][:200]
+    return {}
+
+
+class FakeChatModel(BaseChatModel):
+    """A local stand-in for ChatOpenAI with deterministic, node-shaped replies.
+
+    Latency is drawn from ``latency_distribution`` around ``latency_ms`` and then grows
+    with the reply at ``tokens_per_second``. ``failure_rate`` raises FakeLLMError and
+    ``malformed_rate`` returns text that is not valid JSON. Draws come from an RNG seeded
+    by ``seed``, the prompt and how many times that prompt has been sent, so the n-th call
+    with a given prompt gets the same draws however calls with other prompts interleave.
+    """
+
+    model_name: str = "fake"
+    latency_ms: float = 0.0
+    latency_distribution: str = "fixed"
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 0.0
+    failure_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int = 443
+    calls: int = 0
+    _prompt_calls: Counter[str] = PrivateAttr(default_factory=Counter)
+    _calls_lock: Lock = PrivateAttr(default_factory=Lock)
+
+    @classmethod
+    def from_env(cls, model_name: str) -> "FakeChatModel":
+        distribution = os.getenv("FAKE_LLM_LATENCY_DIST", "fixed").strip().lower()
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"FAKE_LLM_LATENCY_DIST must be one of {list(LATENCY_DISTRIBUTIONS)}")
+        return cls(
+            model_name=model_name,
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+            latency_distribution=distribution,
+            latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.5")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            malformed_rate=float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "443")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: str | None = None, **kwargs: Any) -> Any:
+        names = [convert_to_openai_tool(item)["function"]["name"] for item in tools]
+        return self.bind(tool_names=names, tool_choice=tool_choice, **kwargs)
+
+    def _rng(self, messages: list[BaseMessage]) -> random.Random:
+        digest = hashlib.sha256("\0".join(str(message.content) for message in messages).encode("utf-8")).hexdigest()
+        with self._calls_lock:
+            self.calls += 1
+            self._prompt_calls[digest] += 1
+            count = self._prompt_calls[digest]
+        return random.Random(f"{self.seed}:{digest}:{count}")
+
+    def _latency_seconds(self, rng: random.Random) -> float:
+        base = self.latency_ms / 1000
+        if self.latency_distribution == "uniform":
+            return rng.uniform(0, 2 * base)
+        if self.latency_distribution == "lognormal":
+            # latency_ms is the median; sigma widens the tail.
+            return base * math.exp(rng.gauss(0, self.latency_sigma))
+        return base
+
+    def _reply(self, messages: list[BaseMessage], rng: random.Random, **kwargs: Any) -> tuple[AIMessage, float]:
+        if rng.random() < self.failure_rate:
+            raise FakeLLMError("injected fake LLM failure")
+        system = "\n".join(str(message.content) for message in messages if message.type == "system")
+        user = next((str(message.content) for message in reversed(messages) if message.type == "human"), "")
+        reply = fake_reply(system, user)
+        if kwargs.get("tool_choice") and kwargs.get("tool_names") and isinstance(reply, dict):
+            # Structured output: answer with a call to the bound schema, as OpenAI would.
+            call = {"name": kwargs["tool_names"][0], "args": reply, "id": f"call_{self.calls}"}
+            message = AIMessage(content="", tool_calls=[call])
+            text = json.dumps(reply)
+        else:
+            text = reply if isinstance(reply, str) else json.dumps(reply)
+            if rng.random() < self.malformed_rate:
+                text = text[: len(text) // 2]
+            message = AIMessage(content=text)
+        duration = self._latency_seconds(rng)
+        if self.tokens_per_second > 0:
+            duration += len(text.split()) / self.tokens_per_second
+        return message, duration
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, duration = self._reply(messages, self._rng(messages), **kwargs)
+        time.sleep(duration)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, duration = self._reply(messages, self._rng(messages), **kwargs)
+        await asyncio.sleep(duration)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message, duration = self._reply(messages, self._rng(messages), **kwargs)
+        pieces = self._pieces(message)
+        for piece in pieces:
+            time.sleep(duration / len(pieces))
+            yield self._chunk(piece, message)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message, duration = self._reply(messages, self._rng(messages), **kwargs)
+        pieces = self._pieces(message)
+        for piece in pieces:
+            await asyncio.sleep(duration / len(pieces))
+            chunk = self._chunk(piece, message)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    @staticmethod
+    def _pieces(message: AIMessage) -> list[str]:
+        if message.tool_calls or not isinstance(message.content, str) or not message.content:
+            return [""]
+        words = message.content.split(" ")
+        return [word + " " for word in words[:-1]] + [words[-1]]
+
+    @staticmethod
+    def _chunk(piece: str, message: AIMessage) -> ChatGenerationChunk:
+        if message.tool_calls:
+            chunks = [
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+                for call in message.tool_calls
+            ]
+            return ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+        return ChatGenerationChunk(message=AIMessageChunk(content=piece))
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .search_index import (
+    INDEX_FORMAT,
+    MANIFEST_NAME,
+    MappedSearchIndex,
+    SearchIndex,
+    load_dump_posts,
+    read_manifest,
+    tokenize,
+)
+
+
+def default_index_dir() -> Path:
+    return Path(__file__).resolve().parents[1] / "data" / "search_index"
+
+
+def resident_memory_mb() -> float | None:
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text(encoding="utf-8").splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS where /proc is unavailable (ru_maxrss is KiB on Linux, bytes on macOS).
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if peak > 1 << 30 else peak / 1024
+
+
+def write_segment(index: SearchIndex, directory: Path) -> dict[str, Any]:
+    if not len(index):
+        raise ValueError("refusing to write an empty segment")
+    directory.mkdir(parents=True, exist_ok=False)
+
+    terms = sorted(index.postings)
+    width = max(len(term) for term in terms)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    for position, term in enumerate(terms):
+        term_offsets[position + 1] = term_offsets[position] + index.doc_freq[term]
+    doc_ids = np.empty(int(term_offsets[-1]), dtype=np.uint32)
+    freqs = np.empty(int(term_offsets[-1]), dtype=np.uint32)
+    for position, term in enumerate(terms):
+        start, end = int(term_offsets[position]), int(term_offsets[position + 1])
+        doc_ids[start:end], freqs[start:end] = index.lookup(term)
+
+    meta_offsets = np.zeros(len(index.documents) + 1, dtype=np.int64)
+    with (directory / "meta.bin").open("wb") as meta:
+        for doc_id, doc in enumerate(index.documents):
+            line = json.dumps(doc, ensure_ascii=True).encode("ascii")
+            meta.write(line)
+            meta_offsets[doc_id + 1] = meta_offsets[doc_id] + len(line)
+
+    np.save(directory / "terms.npy", np.array([term.encode("ascii") for term in terms], dtype=f"S{width}"))
+    np.save(directory / "term_offsets.npy", term_offsets)
+    np.save(directory / "doc_ids.npy", doc_ids)
+    np.save(directory / "freqs.npy", freqs)
+    np.save(directory / "doc_lengths.npy", index.doc_lengths.astype(np.uint32))
+    np.save(directory / "popularity.npy", index.popularity)
+    np.save(directory / "meta_offsets.npy", meta_offsets)
+
+    return {
+        "name": directory.name,
+        "documents": len(index),
+        "terms": len(terms),
+        "total_length": int(index.doc_lengths.sum()),
+    }
+
+
+def _write_manifest(index_dir: Path, manifest: dict[str, Any]) -> None:
+    # Readers only ever see a complete manifest: write aside, then rename over.
+    staging = index_dir / f"{MANIFEST_NAME}.tmp"
+    staging.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(staging, index_dir / MANIFEST_NAME)
+
+
+def _indexed_urls(index_dir: Path) -> set[str]:
+    if read_manifest(index_dir) is None:
+        return set()
+    existing = MappedSearchIndex.open(index_dir)
+    urls: set[str] = set()
+    for segment in existing.segments():
+        for doc_id in range(len(segment)):
+            url = str(segment.document(doc_id).get("url", ""))
+            if url:
+                urls.add(url)
+    return urls
+
+
+def build_index(dump_paths: list[Path], index_dir: Path, append: bool = False) -> dict[str, Any]:
+    """Compile Reddit JSON dumps into one new segment.
+
+    With ``append`` the segment is added next to the existing ones and posts whose
+    URL is already indexed are skipped; otherwise it replaces them.
+    """
+    index_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(index_dir) if append else None
+    if manifest is None:
+        manifest = {"format": INDEX_FORMAT, "segments": []}
+
+    seen = _indexed_urls(index_dir) if append else set()
+    posts: list[dict[str, Any]] = []
+    for dump_path in dump_paths:
+        for post in load_dump_posts(dump_path):
+            url = str(post.get("url", ""))
+            if url and url in seen:
+                continue
+            seen.add(url)
+            posts.append(post)
+
+    if posts:
+        name = f"seg-{datetime.now(UTC).strftime('%Y%m%dT%H%M%S%f')}"
+        entry = write_segment(SearchIndex.build(posts, tokenize), index_dir / name)
+        entry["sources"] = [str(path) for path in dump_paths]
+        manifest["segments"].append(entry)
+    manifest["updated_at"] = datetime.now(UTC).isoformat()
+    _write_manifest(index_dir, manifest)
+
+    # Segments dropped from the manifest are unreachable; mapped files may still be
+    # held open by running workers, so removal is best effort.
+    live = {str(entry["name"]) for entry in manifest["segments"]}
+    for child in index_dir.iterdir():
+        if child.is_dir() and child.name.startswith("seg-") and child.name not in live:
+            shutil.rmtree(child, ignore_errors=True)
+    return manifest
+
+
+def _report_open(index_dir: Path, query: str) -> None:
+    rss_before = resident_memory_mb()
+    start = time.perf_counter()
+    index = MappedSearchIndex.open(index_dir)
+    open_ms = (time.perf_counter() - start) * 1000
+    rss_open = resident_memory_mb()
+    start = time.perf_counter()
+    results = index.search(tokenize(query), 5)
+    query_ms = (time.perf_counter() - start) * 1000
+    rss_query = resident_memory_mb()
+
+    def fmt(value: float | None) -> str:
+        return f"{value:.1f} MB" if value is not None else "n/a"
+
+    print(f"documents: {len(index)} in {len(index.segments())} segment(s)")
+    print(f"open: {open_ms:.1f} ms, first query {query!r}: {query_ms:.1f} ms ({len(results)} hits)")
+    print(f"rss: before {fmt(rss_before)}, after open {fmt(rss_open)}, after query {fmt(rss_query)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and inspect the on-disk subreddit search index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="compile Reddit JSON dumps into the index")
+    build.add_argument("dumps", type=Path, nargs="+")
+    build.add_argument("--index-dir", type=Path, default=default_index_dir())
+    build.add_argument("--append", action="store_true", help="add a segment instead of rebuilding")
+
+    stats = subparsers.add_parser("stats", help="report cold-start time and RSS of opening the index")
+    stats.add_argument("--index-dir", type=Path, default=default_index_dir())
+    stats.add_argument("--query", default="birth control")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        start = time.perf_counter()
+        manifest = build_index(args.dumps, args.index_dir, append=args.append)
+        documents = sum(int(entry["documents"]) for entry in manifest["segments"])
+        print(
+            f"indexed {documents} posts in {len(manifest['segments'])} segment(s) "
+            f"at {args.index_dir} in {time.perf_counter() - start:.2f}s"
+        )
+    else:
+        _report_open(args.index_dir, args.query)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,70 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
-from typing import Literal
+from typing import Any, Literal, TypeVar
+from urllib.parse import urlencode
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from .agents import available_agents, run_orchestration
-from .search_tool import search_posts
+from .agents import HISTORY_WINDOW, arun_orchestration, available_agents
+from .audit_policy import audit_status
+from .audit_rules import reload_rules
+from .compaction import compaction_status, schedule_compaction
+from .prompt_budget import tokenizer_name
+from .response_cache import cache_status, node_hit_rates
+from .search_tool import (
+    SearchIndexUnavailable,
+    reload_index,
+    search_posts,
+    search_status,
+    start_background_load,
+    start_background_reload,
+    start_file_watcher,
+)
+from .singleflight import IdempotencyKeyReused, SingleFlight
 from .store import SAVE_BUCKETS, SessionStore
+from .supporting_jobs import SUPPORTING_DRAIN_SECONDS, drain_supporting_jobs, supporting_status
+from .telemetry import TelemetryMiddleware, current_trace, render_metrics
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # The search corpus loads off the startup path so /health answers immediately.
+    start_background_load()
+    start_file_watcher()
+    # Pick the tokenizer off the event loop; PROMPT_TOKENIZER=tiktoken may have to download it.
+    asyncio.get_running_loop().run_in_executor(None, tokenizer_name)
+    yield
+    await drain_supporting_jobs(SUPPORTING_DRAIN_SECONDS)
 
-app = FastAPI(title="CSE443 Multi-Agent Backend", version="0.2.0")
+
+app = FastAPI(title="CSE443 Multi-Agent Backend", version="0.2.0", lifespan=lifespan)
 store = SessionStore()
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip()
+DISCONNECT_POLL_SECONDS = 0.5
+MEMORY_PAGE_SIZE = 50
+MEMORY_MAX_PAGE_SIZE = 500
+# How long a finished /chat response stays available to replays of its Idempotency-Key.
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "1024"))
+
+T = TypeVar("T")
+
+# Identical /chat requests in flight at the same time share one turn; requests sent with an
+# Idempotency-Key also get the finished response back for IDEMPOTENCY_TTL_SECONDS.
+_chat_flights: SingleFlight[dict[str, object]] = SingleFlight()
+_idempotent_chats: SingleFlight[dict[str, object]] = SingleFlight(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +80,22 @@ app.add_middleware(
 )
 
 
+def _is_admin(token: str | None) -> bool:
+    # Fails closed: without a configured ADMIN_TOKEN nobody is an admin.
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def _require_admin(token: str | None) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="admin endpoints are disabled; set ADMIN_TOKEN")
+    if not _is_admin(token):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+# Traces expose prompts and timings, so they are admin-only.
+app.add_middleware(TelemetryMiddleware, trace_allowed=lambda headers: _is_admin(headers.get("x-admin-token")))
+
+
 class ChatRequest(BaseModel):
     message: str = Field(min_length=1)
     active_agent: Literal["yapper", "definer", "redditor", "engager", "auditor"]
@@ -34,11 +104,15 @@ class ChatRequest(BaseModel):
     search_query: str | None = None
     save_to: Literal["journal", "definitions", "threads", "drafts", "audit_logs"] | None = None
     session_id: str = "default"
+    bypass_cache: bool = False
+    leader_mode: Literal["two_pass", "single_pass"] | None = None
+    supporting_mode: Literal["inline", "background"] | None = None
 
 
 class SearchRequest(BaseModel):
     query: str = Field(min_length=1)
     limit: int = Field(default=5, ge=1, le=20)
+    scorer: Literal["bm25", "legacy"] | None = None
 
 
 class SaveRequest(BaseModel):
@@ -91,8 +165,21 @@ def _format_supporting_message(agent: str, payload: object) -> str | None:
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def health() -> dict[str, object]:
+    return {
+        "status": "ok",
+        "search_index": search_status(),
+        "node_cache": cache_status(),
+        "history_compaction": compaction_status(),
+        "audit": audit_status(),
+        "supporting_jobs": supporting_status(),
+        "chat_single_flight": {"concurrent": dict(_chat_flights.stats), "idempotent": dict(_idempotent_chats.stats)},
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    return render_metrics()
 
 
 @app.get("/agents")
@@ -102,85 +189,380 @@ def agents() -> dict[str, list[str]]:
 
 @app.post("/search")
 def search(req: SearchRequest) -> dict[str, object]:
-    return {"query": req.query, "results": search_posts(req.query, req.limit)}
-
-
-@app.post("/chat")
-def chat(req: ChatRequest) -> dict[str, object]:
-    if req.enabled_agents and req.active_agent not in req.enabled_agents:
-        raise HTTPException(status_code=400, detail="active_agent must be in enabled_agents.")
-
-    session = store.get_session(req.session_id)
-    history = session.get("conversation_history", [])
-    history.append({"role": "user", "content": req.message})
-
     try:
-        orchestration = run_orchestration(
-            message=req.message,
-            model_name=req.model_name,
-            conversation_history=history,
-            active_agent=req.active_agent,
-            enabled_agents=req.enabled_agents,
-            search_query=req.search_query,
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+        results = search_posts(req.query, req.limit, req.scorer)
+    except SearchIndexUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "2"}) from exc
+    return {"query": req.query, "results": results}
+
 
+def _persist_turn(req: ChatRequest, orchestration: dict[str, Any], turn_id: str) -> None:
     response_text = str(orchestration["response"])
     leader_response = str(orchestration.get("leader_response", response_text))
-    store.append_history(req.session_id, "user", req.message)
-    store.append_history(req.session_id, "assistant", leader_response)
+    with store.unit_of_work(req.session_id) as turn:
+        turn.append_history("user", req.message)
+        turn.append_history("assistant", leader_response)
 
-    leader_output = orchestration.get("leader_output", {})
-    symptoms = leader_output.get("candidate_symptoms", [])
-    if isinstance(symptoms, list):
-        store.set_structured_symptom_list(req.session_id, [str(item) for item in symptoms])
+        leader_output = orchestration.get("leader_output", {})
+        symptoms = leader_output.get("candidate_symptoms", [])
+        if isinstance(symptoms, list):
+            turn.set_structured_symptom_list([str(item) for item in symptoms])
 
-    selected_nodes = orchestration.get("selected_supporting_nodes", [])
-    active_nodes = [req.active_agent, *[str(item) for item in selected_nodes], "auditor"]
-    store.set_active_agents(req.session_id, active_nodes)
+        selected_nodes = orchestration.get("selected_supporting_nodes", [])
+        turn.set_active_agents([req.active_agent, *[str(item) for item in selected_nodes], "auditor"])
 
-    audit_output = orchestration.get("audit_output", {})
-    store.append_audit_log(
-        req.session_id,
-        {
-            "timestamp": datetime.now(UTC).isoformat(),
-            "active_agent": req.active_agent,
-            "flagged_segments": audit_output.get("flagged_segments", []),
-            "revision_suggestions": audit_output.get("revision_suggestions", []),
-        },
-    )
+        audit_output = orchestration.get("audit_output", {})
+        turn.append_audit_log(
+            {
+                "timestamp": datetime.now(UTC).isoformat(),
+                "active_agent": req.active_agent,
+                "audit_path": orchestration.get("audit_path", "full"),
+                "flagged_segments": audit_output.get("flagged_segments", []),
+                "revision_suggestions": audit_output.get("revision_suggestions", []),
+                "rule_matches": audit_output.get("rule_matches", []),
+            }
+        )
 
-    if req.save_to:
-        store.save(
+        if req.save_to:
+            turn.save(
+                req.save_to,
+                {
+                    "timestamp": datetime.now(UTC).isoformat(),
+                    "agent": req.active_agent,
+                    "message": req.message,
+                    "response": response_text,
+                },
+            )
+    if orchestration.get("supporting", {}).get("pending"):
+        store.set_supporting_result(req.session_id, turn_id, "pending")
+
+
+def _deferred_audit_logger(req: ChatRequest) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    # A deferred audit finishes after the turn was saved, so its result gets its own log entry.
+    async def log(audit_output: dict[str, Any]) -> None:
+        await run_in_threadpool(
+            store.append_audit_log,
             req.session_id,
-            req.save_to,
             {
                 "timestamp": datetime.now(UTC).isoformat(),
-                "agent": req.active_agent,
-                "message": req.message,
-                "response": response_text,
+                "active_agent": req.active_agent,
+                "audit_path": "deferred",
+                "flagged_segments": audit_output.get("flagged_segments", []),
+                "revision_suggestions": audit_output.get("revision_suggestions", []),
             },
         )
 
+    return log
+
+
+def _supporting_result_saver(req: ChatRequest, turn_id: str) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    # Background supporting nodes finish after the turn was returned; keep their output for polling.
+    async def save(result: dict[str, Any]) -> None:
+        status = str(result.pop("status"))
+        await run_in_threadpool(store.set_supporting_result, req.session_id, turn_id, status, result)
+        audit_output = result.get("audit_output")
+        if isinstance(audit_output, dict):
+            await run_in_threadpool(
+                store.append_audit_log,
+                req.session_id,
+                {
+                    "timestamp": datetime.now(UTC).isoformat(),
+                    "active_agent": req.active_agent,
+                    "turn_id": turn_id,
+                    "audit_path": f"supporting:{result.get('audit_path', 'full')}",
+                    "flagged_segments": audit_output.get("flagged_segments", []),
+                    "revision_suggestions": audit_output.get("revision_suggestions", []),
+                    "rule_matches": audit_output.get("rule_matches", []),
+                },
+            )
+
+    return save
+
+
+def _supporting_messages(orchestration: dict[str, Any]) -> list[dict[str, str]]:
     supporting_outputs = orchestration.get("supporting_outputs", {})
-    agent_messages: list[dict[str, str]] = [{"agent": req.active_agent, "text": leader_response}]
+    messages: list[dict[str, str]] = []
     for node_name in orchestration.get("selected_supporting_nodes", []):
         text = _format_supporting_message(str(node_name), supporting_outputs.get(str(node_name)))
         if text:
-            agent_messages.append({"agent": str(node_name), "text": text})
+            messages.append({"agent": str(node_name), "text": text})
+    return messages
+
+
+def _with_trace(payload: dict[str, object]) -> dict[str, object]:
+    trace = current_trace()
+    if trace is not None:
+        payload["trace"] = trace.as_dict()
+    return payload
+
+
+def _chat_response(req: ChatRequest, orchestration: dict[str, Any], turn_id: str) -> dict[str, object]:
+    response_text = str(orchestration["response"])
+    leader_response = str(orchestration.get("leader_response", response_text))
+    supporting_outputs = orchestration.get("supporting_outputs", {})
+    agent_messages = [{"agent": req.active_agent, "text": leader_response}, *_supporting_messages(orchestration)]
+    supporting = dict(orchestration.get("supporting", {}))
+    if supporting.get("pending"):
+        supporting["url"] = f"/chat/turns/{turn_id}/supporting?" + urlencode({"session_id": req.session_id})
 
     return {
+        "turn_id": turn_id,
         "active_agent": req.active_agent,
         "response": response_text,
         "agent_messages": agent_messages,
         "tool_results": orchestration.get("thread_summaries", []),
-        "intermediate": leader_output,
+        "intermediate": orchestration.get("leader_output", {}),
         "supporting_outputs": supporting_outputs,
-        "audit": audit_output,
+        "audit": orchestration.get("audit_output", {}),
+        "node_timings": orchestration.get("node_timings", {}),
+        "cache": {"nodes": orchestration.get("cache", {}), "hit_rates": node_hit_rates()},
+        "prompt_tokens": orchestration.get("prompt_tokens", {}),
+        "leader": orchestration.get("leader", {}),
+        "audit_path": orchestration.get("audit_path"),
+        "partial": orchestration.get("partial", False),
+        "degraded": orchestration.get("degraded", {}),
+        "supporting": supporting,
     }
 
 
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    # Starlette does not cancel handlers when the client goes away, so watch for it
+    # and cancel the orchestration (and its in-flight LLM calls) ourselves.
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _load_context(session_id: str) -> tuple[list[dict[str, str]], str | None]:
+    # Prompts only see the last HISTORY_WINDOW messages, including the new one, plus
+    # the summary of anything compacted away.
+    history = store.recent_history(session_id, HISTORY_WINDOW - 1)
+    summary = store.get_summary(session_id)
+    return history, summary["summary"] if summary else None
+
+
+async def _chat_context(req: ChatRequest) -> tuple[list[dict[str, str]], str | None]:
+    if req.enabled_agents and req.active_agent not in req.enabled_agents:
+        raise HTTPException(status_code=400, detail="active_agent must be in enabled_agents.")
+
+    history, summary = await run_in_threadpool(_load_context, req.session_id)
+    history.append({"role": "user", "content": req.message})
+    return history, summary
+
+
+async def _run_chat_turn(req: ChatRequest) -> dict[str, object]:
+    history, summary = await _chat_context(req)
+    turn_id = uuid.uuid4().hex
+
+    try:
+        orchestration = await arun_orchestration(
+            message=req.message,
+            model_name=req.model_name,
+            conversation_history=history,
+            active_agent=req.active_agent,
+            enabled_agents=req.enabled_agents,
+            search_query=req.search_query,
+            use_cache=not req.bypass_cache,
+            history_summary=summary,
+            leader_mode=req.leader_mode,
+            on_deferred_audit=_deferred_audit_logger(req),
+            supporting_mode=req.supporting_mode,
+            on_supporting_result=_supporting_result_saver(req, turn_id),
+        )
+    except HTTPException:
+        raise
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail="chat turn exceeded its deadline") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    await run_in_threadpool(_persist_turn, req, orchestration, turn_id)
+    schedule_compaction(store, req.session_id, req.model_name)
+    return _chat_response(req, orchestration, turn_id)
+
+
+@app.post("/chat")
+async def chat(
+    req: ChatRequest,
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(default=None),
+) -> dict[str, object]:
+    """Run one chat turn.
+
+    A request identical to one already in flight (same session, message and options)
+    waits for that turn instead of running its own. With an ``Idempotency-Key`` header the
+    finished response is also replayed to retries with the same key; reusing the key for
+    a different request is a 422. Shared and replayed responses carry ``X-Single-Flight``.
+    """
+    fingerprint = hashlib.sha256(req.model_dump_json().encode("utf-8")).hexdigest()
+    if idempotency_key:
+        flights, key = _idempotent_chats, f"{req.session_id}\0{idempotency_key}"
+    else:
+        flights, key = _chat_flights, f"{req.session_id}\0{fingerprint}"
+    try:
+        payload, role = await _cancel_on_disconnect(request, flights.run(key, lambda: _run_chat_turn(req), fingerprint))
+    except IdempotencyKeyReused as exc:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request") from exc
+    if role != "leader":
+        response.headers["X-Single-Flight"] = role
+    # The payload may be shared with other callers, so the trace goes on a copy.
+    return _with_trace(dict(payload))
+
+
+def _sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_turn(
+    req: ChatRequest,
+    history: list[dict[str, str]],
+    summary: str | None,
+) -> AsyncIterator[str]:
+    events: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue()
+    turn_id = uuid.uuid4().hex
+
+    async def on_event(name: str, payload: dict[str, Any]) -> None:
+        events.put_nowait((name, payload))
+
+    async def run() -> dict[str, Any]:
+        try:
+            return await arun_orchestration(
+                message=req.message,
+                model_name=req.model_name,
+                conversation_history=history,
+                active_agent=req.active_agent,
+                enabled_agents=req.enabled_agents,
+                search_query=req.search_query,
+                on_event=on_event,
+                use_cache=not req.bypass_cache,
+                history_summary=summary,
+                leader_mode=req.leader_mode,
+                on_deferred_audit=_deferred_audit_logger(req),
+                supporting_mode=req.supporting_mode,
+                on_supporting_result=_supporting_result_saver(req, turn_id),
+            )
+        finally:
+            events.put_nowait(None)
+
+    started = time.perf_counter()
+    first_token_ms: float | None = None
+    # Starlette cancels this generator when the client disconnects; the finally
+    # block then cancels the orchestration with it.
+    task = asyncio.create_task(run())
+    try:
+        while (item := await events.get()) is not None:
+            name, payload = item
+            if name == "leader_token":
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                yield _sse("token", {"agent": req.active_agent, "text": payload["text"]})
+            elif name == "leader_output":
+                yield _sse("intermediate", payload["leader_output"])
+            elif name == "leader_response":
+                yield _sse("leader", {"agent": req.active_agent, "text": payload["text"]})
+            elif name == "node":
+                text = _format_supporting_message(payload["agent"], payload["output"])
+                if text:
+                    yield _sse("agent_message", {"agent": payload["agent"], "text": text})
+            elif name == "audit":
+                yield _sse("audit", payload)
+
+        orchestration = await task
+        await run_in_threadpool(_persist_turn, req, orchestration, turn_id)
+        schedule_compaction(store, req.session_id, req.model_name)
+        yield _sse(
+            "done", _with_trace({**_chat_response(req, orchestration, turn_id), "first_token_ms": first_token_ms})
+        )
+    except Exception as exc:
+        yield _sse("error", {"detail": str(exc) or type(exc).__name__})
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    """Server-Sent Events variant of ``/chat``.
+
+    Emits ``intermediate``, ``token`` (leader response deltas), ``leader``,
+    ``agent_message`` per supporting node as it finishes, ``audit``, and finally
+    ``done`` carrying the same payload as ``/chat`` (or ``error``).
+    """
+    history, summary = await _chat_context(req)
+    return StreamingResponse(
+        _stream_turn(req, history, summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/chat/turns/{turn_id}/supporting")
+def supporting_result(turn_id: str, session_id: str = "default") -> dict[str, object]:
+    """Supporting-node output of a turn run with ``supporting_mode="background"``.
+
+    ``status`` is ``pending`` until the nodes finish, then ``done`` or ``failed``.
+    """
+    stored = store.get_supporting_result(session_id, turn_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="no background supporting nodes for this turn")
+    payload: dict[str, object] = {"turn_id": turn_id, "session_id": session_id, "status": stored["status"]}
+    result = stored["result"] or {}
+    if stored["status"] == "failed":
+        payload["error"] = result.get("error")
+    elif stored["status"] == "done":
+        payload.update(
+            agent_messages=_supporting_messages(result),
+            supporting_outputs=result.get("supporting_outputs", {}),
+            tool_results=result.get("thread_summaries", []),
+            audit=result.get("audit_output", {}),
+            audit_path=result.get("audit_path"),
+            node_timings=result.get("node_timings", {}),
+            partial=result.get("partial", False),
+            degraded=result.get("degraded", {}),
+        )
+    payload["updated_at"] = stored["updated_at"]
+    return payload
+
+
+@app.post("/admin/search/reload")
+def reload_search(
+    response: Response,
+    wait: bool = False,
+    x_admin_token: str | None = Header(default=None),
+) -> dict[str, object]:
+    _require_admin(x_admin_token)
+    if not wait:
+        start_background_reload()
+        response.status_code = 202
+        return {"status": "started", "search_index": search_status()}
+    try:
+        result = reload_index()
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"search index reload failed: {exc}") from exc
+    return {**result, "search_index": search_status()}
+
+
+@app.post("/admin/audit/reload")
+def reload_audit_rules(x_admin_token: str | None = Header(default=None)) -> dict[str, object]:
+    """Recompile the audit rules file; the current rules stay active if it is invalid."""
+    _require_admin(x_admin_token)
+    try:
+        engine = reload_rules()
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=f"audit rules reload failed: {exc}") from exc
+    return {"status": "reloaded", "rules": len(engine.rules)}
+
+
 @app.post("/memory")
 def save(req: SaveRequest) -> dict[str, str]:
     if req.bucket not in SAVE_BUCKETS:
@@ -197,10 +579,31 @@ def save(req: SaveRequest) -> dict[str, str]:
 
 
 @app.get("/memory/{bucket}")
-def list_saved(bucket: str, session_id: str = "default") -> dict[str, object]:
+def list_saved(
+    bucket: str,
+    session_id: str = "default",
+    cursor: int | None = Query(default=None, ge=0),
+    limit: int | None = Query(default=None, ge=1, le=MEMORY_MAX_PAGE_SIZE),
+) -> dict[str, object]:
+    """The whole bucket, or one page of it when ``cursor`` or ``limit`` is given."""
     if bucket not in SAVE_BUCKETS:
         raise HTTPException(status_code=400, detail=f"bucket must be one of {sorted(SAVE_BUCKETS)}")
-    return {"bucket": bucket, "session_id": session_id, "items": store.list_saved(session_id, bucket)}
+    if cursor is not None and limit is None:
+        limit = MEMORY_PAGE_SIZE
+    items, next_cursor = store.list_saved_page(session_id, bucket, after=cursor, limit=limit)
+    return {"bucket": bucket, "session_id": session_id, "items": items, "next_cursor": next_cursor}
+
+
+@app.get("/memory/{bucket}/export")
+def export_saved(bucket: str, session_id: str = "default") -> StreamingResponse:
+    """Every item in the bucket as NDJSON (one ``{"id", "item"}`` object per line)."""
+    if bucket not in SAVE_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {sorted(SAVE_BUCKETS)}")
+    lines = (
+        json.dumps({"id": item_id, "item": item}, ensure_ascii=False) + "\n"
+        for item_id, item in store.iter_saved(session_id, bucket)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 
 @app.post("/session/delete")
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from math import ceil
+from textwrap import dedent
+from threading import Lock
+from typing import Any
+
+TOKENIZERS = ("auto", "tiktoken", "approx")
+TOKENIZER = os.getenv("PROMPT_TOKENIZER", "auto").strip().lower() or "auto"
+TIKTOKEN_ENCODING = os.getenv("PROMPT_TIKTOKEN_ENCODING", "o200k_base")
+TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+# Token budgets for the user message of each node call (history + payload), before the system prompt.
+DEFAULT_BUDGETS = {
+    "leader_parse": 1500,
+    "leader_turn": 1500,
+    "leader_response": 2000,
+    "definer": 800,
+    "redditor": 1000,
+    "engager": 1500,
+    "auditor": 2500,
+    "supporting_auditor": 2500,
+}
+NODE_BUDGETS = {
+    node: int(os.getenv(f"PROMPT_BUDGET_{node.upper()}", str(budget))) for node, budget in DEFAULT_BUDGETS.items()
+}
+
+# The parts of the leader's parse each supporting node actually uses; None passes it whole.
+NODE_LEADER_FIELDS: dict[str, tuple[str, ...] | None] = {
+    "leader_response": None,
+    "definer": ("candidate_symptoms", "raw_symptom_phrases"),
+    "redditor": ("research_keywords", "candidate_symptoms"),
+    "engager": (
+        "narrative_summary",
+        "candidate_symptoms",
+        "timeline_information",
+        "reported_impacts",
+        "questions_to_clarify",
+    ),
+}
+
+MIN_FIELD_CHARS = 80
+TRUNCATION_MARK = " ...[truncated]"
+
+_tokenizer_lock = Lock()
+_encoder: Callable[[str], int] | None = None
+_encoder_name = ""
+
+
+def _approx_count(text: str) -> int:
+    # Roughly what BPE tokenizers do with English: a token per short word or symbol,
+    # long words split every ~4 characters.
+    return sum(max(1, ceil(len(piece) / 4)) for piece in re.findall(r"\w+|[^\w\s]", text))
+
+
+def _tiktoken_cached(encoding: str) -> bool:
+    # Mirrors tiktoken.load.read_file_cached: get_encoding() downloads the BPE file
+    # (blocking, without a timeout) unless it is already in this cache.
+    cache_dir = os.getenv("TIKTOKEN_CACHE_DIR", os.getenv("DATA_GYM_CACHE_DIR"))
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    key = hashlib.sha1(TIKTOKEN_BLOB_URL.format(encoding).encode()).hexdigest()
+    return os.path.exists(os.path.join(cache_dir, key))
+
+
+def _load_encoder() -> tuple[Callable[[str], int], str]:
+    if TOKENIZER not in TOKENIZERS:
+        raise ValueError(f"PROMPT_TOKENIZER must be one of {list(TOKENIZERS)}")
+    # "auto" never goes to the network: tiktoken only if its encoding is already cached.
+    if TOKENIZER == "tiktoken" or (TOKENIZER == "auto" and _tiktoken_cached(TIKTOKEN_ENCODING)):
+        try:
+            import tiktoken
+
+            encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+            return (lambda text: len(encoding.encode(text, disallowed_special=()))), f"tiktoken:{TIKTOKEN_ENCODING}"
+        except Exception:
+            if TOKENIZER == "tiktoken":
+                raise
+    return _approx_count, "approx"
+
+
+def count_tokens(text: str) -> int:
+    global _encoder, _encoder_name
+    if _encoder is None:
+        with _tokenizer_lock:
+            if _encoder is None:
+                _encoder, _encoder_name = _load_encoder()
+    return _encoder(text)
+
+
+def tokenizer_name() -> str:
+    count_tokens("")
+    return _encoder_name
+
+
+def select_leader_fields(node: str, leader_output: dict[str, Any]) -> dict[str, Any]:
+    fields = NODE_LEADER_FIELDS.get(node)
+    if fields is None:
+        return leader_output
+    return {field: leader_output[field] for field in fields if field in leader_output}
+
+
+def render_message(history: list[dict[str, str]], payload: dict[str, Any], summary: str | None = None) -> str:
+    # Turns compacted out of the stored history survive only as the session summary.
+    summary_text = f"Earlier conversation summary:\n{summary.strip()}\n\n" if summary and summary.strip() else ""
+    history_text = "\n".join(f"{item.get('role', 'user')}: {item.get('content', '')}" for item in history)
+    return summary_text + dedent(
+        f"""
+        Conversation history:
+        {history_text if history_text else "(none)"}
+
+        Payload JSON:
+        {json.dumps(payload, ensure_ascii=True)}
+        """
+    ).strip()
+
+
+@dataclass
+class FittedPrompt:
+    text: str
+    tokens: int
+    budget: int
+    dropped_history: int = 0
+    truncations: int = 0
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens > self.budget
+
+
+def _longest_string(value: Any, path: tuple[Any, ...] = ()) -> tuple[int, tuple[Any, ...]]:
+    if isinstance(value, str):
+        return len(value), path
+    best = (0, path)
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, child in items:
+        candidate = _longest_string(child, (*path, key))
+        if candidate[0] > best[0]:
+            best = candidate
+    return best
+
+
+def _truncate_at(payload: Any, path: tuple[Any, ...], keep: int) -> None:
+    parent = payload
+    for key in path[:-1]:
+        parent = parent[key]
+    original = parent[path[-1]]
+    parent[path[-1]] = original[:keep].rstrip() + TRUNCATION_MARK
+
+
+def fit_prompt(
+    history: list[dict[str, str]],
+    payload: dict[str, Any],
+    budget: int,
+    summary: str | None = None,
+) -> FittedPrompt:
+    """Render a node message within ``budget`` tokens.
+
+    Drops the oldest history messages first, then halves the longest string in the payload
+    until it fits or nothing longer than MIN_FIELD_CHARS is left.
+    """
+    history = list(history)
+    text = render_message(history, payload, summary)
+    tokens = count_tokens(text)
+    dropped = 0
+    while tokens > budget and history:
+        history.pop(0)
+        dropped += 1
+        text = render_message(history, payload, summary)
+        tokens = count_tokens(text)
+
+    truncations = 0
+    if tokens > budget:
+        payload = json.loads(json.dumps(payload))
+        while tokens > budget:
+            length, path = _longest_string(payload)
+            if length <= MIN_FIELD_CHARS or not path:
+                break
+            _truncate_at(payload, path, max(MIN_FIELD_CHARS, length // 2))
+            truncations += 1
+            text = render_message(history, payload, summary)
+            tokens = count_tokens(text)
+    return FittedPrompt(text, tokens, budget, dropped, truncations)
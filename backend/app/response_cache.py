@@ -0,0 +1,271 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Protocol
+
+CACHE_BACKENDS = ("memory", "sqlite", "tiered", "off")
+
+DEFAULT_BACKEND = os.getenv("NODE_CACHE_BACKEND", "memory").strip().lower() or "memory"
+TTL_SECONDS = float(os.getenv("NODE_CACHE_TTL_SECONDS", "3600"))
+MAX_ENTRIES = int(os.getenv("NODE_CACHE_MAX_ENTRIES", "1024"))
+DB_MAX_ENTRIES = int(os.getenv("NODE_CACHE_DB_MAX_ENTRIES", "20000"))
+# The persistent tier checks its size cap every this many writes instead of counting rows on each one.
+DB_PRUNE_EVERY = int(os.getenv("NODE_CACHE_DB_PRUNE_EVERY", "100"))
+DB_PATH = Path(
+    os.getenv("NODE_CACHE_DB", str(Path(__file__).resolve().parents[1] / "data" / "node_cache.db"))
+)
+
+
+class CacheBackend(Protocol):
+    name: str
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+def normalize_content(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def cache_key(model_name: str, system_prompt: str, user_content: str) -> str:
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    content = normalize_content(user_content)
+    return hashlib.sha256(f"{model_name}\0{prompt_hash}\0{content}".encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """LRU of node responses with a per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl_seconds: float = TTL_SECONDS) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"backend": self.name, "entries": len(self._entries), "max_entries": self.max_entries, **self._counters}
+
+
+class SQLiteCache:
+    """Persistent tier: survives restarts and is shared by workers on the same host."""
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        db_path: str | Path = DB_PATH,
+        max_entries: int = DB_MAX_ENTRIES,
+        ttl_seconds: float = TTL_SECONDS,
+        prune_every: int = DB_PRUNE_EVERY,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if prune_every <= 0:
+            raise ValueError("prune_every must be positive")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS node_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_node_cache_accessed ON node_cache (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._connection() as conn:
+            row = conn.execute("SELECT value, expires_at FROM node_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM node_cache WHERE cache_key = ?", (key,))
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            conn.execute("UPDATE node_cache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+            self._counters["hits"] += 1
+            return str(row[0])
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO node_cache (cache_key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            # COUNT(*) scans the table, so the cap may be overshot by up to prune_every - 1 rows.
+            self._writes += 1
+            if self._writes % self.prune_every:
+                return
+            (count,) = conn.execute("SELECT COUNT(*) FROM node_cache").fetchone()
+            if count > self.max_entries:
+                expired = conn.execute("DELETE FROM node_cache WHERE expires_at <= ?", (now,)).rowcount
+                self._counters["expirations"] += expired
+                overflow = count - expired - self.max_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM node_cache WHERE cache_key IN "
+                        "(SELECT cache_key FROM node_cache ORDER BY accessed_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._counters["evictions"] += overflow
+
+    def clear(self) -> None:
+        with self._lock, self._connection() as conn:
+            conn.execute("DELETE FROM node_cache")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock, self._connection() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM node_cache").fetchone()
+            return {"backend": self.name, "entries": count, "max_entries": self.max_entries, **self._counters}
+
+
+class TieredCache:
+    """Checks each tier in order; a hit in a slower tier is copied into the faster ones."""
+
+    name = "tiered"
+
+    def __init__(self, tiers: list[CacheBackend]) -> None:
+        if not tiers:
+            raise ValueError("at least one cache tier is required")
+        self.tiers = tiers
+
+    def get(self, key: str) -> str | None:
+        for position, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:position]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": self.name, "tiers": [tier.stats() for tier in self.tiers]}
+
+
+def make_cache(backend: str) -> CacheBackend | None:
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"node cache backend must be one of {list(CACHE_BACKENDS)}")
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "sqlite":
+        return SQLiteCache()
+    if backend == "tiered":
+        return TieredCache([MemoryCache(), SQLiteCache()])
+    return None
+
+
+_cache: CacheBackend | None = None
+_configured = False
+_state_lock = Lock()
+_node_counters: dict[str, dict[str, int]] = {}
+
+
+def get_node_cache() -> CacheBackend | None:
+    global _cache, _configured
+    with _state_lock:
+        if not _configured:
+            _cache = make_cache(DEFAULT_BACKEND)
+            _configured = True
+        return _cache
+
+
+def set_node_cache(cache: CacheBackend | None) -> None:
+    """Swap the cache backend (``None`` disables caching)."""
+    global _cache, _configured
+    with _state_lock:
+        _cache = cache
+        _configured = True
+        _node_counters.clear()
+
+
+def record_lookup(node: str, hit: bool) -> None:
+    with _state_lock:
+        counters = _node_counters.setdefault(node, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+
+def node_hit_rates() -> dict[str, dict[str, Any]]:
+    with _state_lock:
+        return {
+            node: {**counters, "hit_rate": round(counters["hits"] / (counters["hits"] + counters["misses"]), 3)}
+            for node, counters in _node_counters.items()
+        }
+
+
+def cache_status() -> dict[str, Any]:
+    cache = get_node_cache()
+    return {
+        "enabled": cache is not None,
+        "store": cache.stats() if cache is not None else None,
+        "nodes": node_hit_rates(),
+    }
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .telemetry import NODE_DURATION, NODE_ERRORS, span
+
+
+@dataclass(frozen=True)
+class GraphNode:
+    """A unit of work that runs once every node in ``deps`` has finished.
+
+    ``run`` is a coroutine function receiving the results of the nodes finished so far,
+    keyed by name. A ``required`` node that fails aborts the graph; any other failure is
+    recorded and its dependents still run without that result. A node still running
+    after ``timeout`` seconds is cancelled and fails with TimeoutError.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    required: bool = False
+    timeout: float | None = None
+
+
+@dataclass
+class GraphResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+    timings: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+def _validate(nodes: list[GraphNode]) -> dict[str, GraphNode]:
+    by_name = {node.name: node for node in nodes}
+    if len(by_name) != len(nodes):
+        raise ValueError("graph node names must be unique")
+    for node in nodes:
+        missing = [dep for dep in node.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"node {node.name!r} depends on unknown nodes {missing}")
+    return by_name
+
+
+async def run_graph(
+    nodes: list[GraphNode],
+    on_complete: Callable[[str, Any], Awaitable[None]] | None = None,
+    deadline: float | None = None,
+) -> GraphResult:
+    """Run ``nodes`` as asyncio tasks, starting each one as soon as its inputs are ready.
+
+    ``on_complete`` is awaited with each successful node's name and result as it
+    finishes. ``deadline`` (seconds) caps every node's timeout to the time left for the
+    whole graph. Cancelling the caller cancels every node still running.
+    """
+    by_name = _validate(nodes)
+    outcome = GraphResult()
+    origin = time.perf_counter()
+    deadline_at = origin + deadline if deadline is not None else None
+    pending = dict(by_name)
+    done: set[str] = set()
+    running: dict[asyncio.Task[Any], str] = {}
+
+    async def timed(node: GraphNode, inputs: dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        outcome.timings[node.name] = {"start_ms": round((start - origin) * 1000, 1)}
+        timeout = node.timeout
+        if deadline_at is not None:
+            remaining = max(0.0, deadline_at - start)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            with span("node", NODE_DURATION, node=node.name):
+                async with asyncio.timeout(timeout):
+                    return await node.run(inputs)
+        except Exception as exc:
+            NODE_ERRORS.inc(node=node.name, error=type(exc).__name__)
+            raise
+        finally:
+            end = time.perf_counter()
+            outcome.timings[node.name].update(
+                end_ms=round((end - origin) * 1000, 1),
+                duration_ms=round((end - start) * 1000, 1),
+            )
+
+    try:
+        while pending or running:
+            for name, node in list(pending.items()):
+                if all(dep in done for dep in node.deps):
+                    del pending[name]
+                    task = asyncio.create_task(timed(node, dict(outcome.results)), name=f"graph:{name}")
+                    running[task] = name
+            if not running:
+                raise ValueError(f"graph has a dependency cycle among {sorted(pending)}")
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                done.add(name)
+                try:
+                    outcome.results[name] = task.result()
+                except Exception as exc:
+                    outcome.errors[name] = exc
+                    outcome.timings[name]["error"] = type(exc).__name__
+                    if by_name[name].required:
+                        raise
+                    continue
+                if on_complete is not None:
+                    await on_complete(name, outcome.results[name])
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+    return outcome
@@ -0,0 +1,287 @@
+import json
+import re
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterable
+from math import log
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SCORERS = ("bm25", "legacy")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_POPULARITY_WEIGHT = 0.1
+LEGACY_POPULARITY_WEIGHT = 0.3
+
+MANIFEST_NAME = "manifest.json"
+INDEX_FORMAT = 1
+
+
+def tokenize(text: str) -> list[str]:
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    return text.split()
+
+
+def load_dump_posts(json_path: Path) -> list[dict[str, Any]]:
+    """Read the posts of a Reddit JSON dump (a Listing, or a list of Listings)."""
+    with json_path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    listings = data if isinstance(data, list) else [data]
+    docs: list[dict[str, Any]] = []
+    for listing in listings:
+        if not isinstance(listing, dict):
+            continue
+        for child in listing.get("data", {}).get("children", []):
+            if child.get("kind", "t3") != "t3":
+                continue
+            post = child.get("data", {})
+            title = post.get("title", "")
+            body = post.get("selftext", "")
+            text = f"{title} {body}".strip()
+            docs.append(
+                {
+                    "title": title,
+                    "text": text,
+                    "url": post.get("url", ""),
+                    "ups": post.get("ups", 0),
+                    "comments": post.get("num_comments", 0),
+                }
+            )
+    return docs
+
+
+def _length_norms(doc_lengths: np.ndarray, avg_length: float) -> np.ndarray:
+    return BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(doc_lengths, dtype=np.float64) / max(avg_length, 1.0))
+
+
+class BaseSearchIndex(ABC):
+    """Scoring shared by the in-memory index and the memory-mapped segments.
+
+    An index is a list of segments. Each segment numbers its posts from zero and
+    provides ``lookup(term)``, ``length_norms``, ``popularity`` and ``document(doc_id)``.
+    """
+
+    @abstractmethod
+    def segments(self) -> list[Any]:
+        """The index's segments, in ``doc_id`` order."""
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments())
+
+    def search(self, query_tokens: list[str], limit: int = 5, scorer: str = "bm25") -> list[tuple[float, dict[str, Any]]]:
+        if scorer not in SCORERS:
+            raise ValueError(f"scorer must be one of {list(SCORERS)}")
+        segments = self.segments()
+        total = sum(len(segment) for segment in segments)
+        if limit <= 0 or not total:
+            return []
+
+        query_counts = Counter(query_tokens)
+        hits: list[tuple[int, Any, str, np.ndarray, np.ndarray]] = []
+        doc_freq: Counter[str] = Counter()
+        base = 0
+        for segment in segments:
+            for term in query_counts:
+                found = segment.lookup(term)
+                if found is not None:
+                    hits.append((base, segment, term, found[0], found[1]))
+                    doc_freq[term] += len(found[0])
+            base += len(segment)
+        if not hits:
+            return []
+
+        id_chunks: list[np.ndarray] = []
+        score_chunks: list[np.ndarray] = []
+        segment_candidates: dict[int, tuple[Any, list[np.ndarray]]] = {}
+        for base, segment, term, doc_ids, freqs in hits:
+            freqs = freqs.astype(np.float64)
+            if scorer == "bm25":
+                idf = log(1 + (total - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score_chunks.append(idf * freqs * (BM25_K1 + 1) / (freqs + segment.length_norms[doc_ids]))
+            else:
+                # Raw term frequency, counting repeated query words like the original scorer.
+                score_chunks.append(freqs * query_counts[term])
+            id_chunks.append(doc_ids.astype(np.int64) + base)
+            segment_candidates.setdefault(base, (segment, []))[1].append(doc_ids)
+
+        # The popularity prior is added once per candidate post.
+        weight = BM25_POPULARITY_WEIGHT if scorer == "bm25" else LEGACY_POPULARITY_WEIGHT
+        for base, (segment, chunks) in segment_candidates.items():
+            doc_ids = np.unique(np.concatenate(chunks))
+            id_chunks.append(doc_ids.astype(np.int64) + base)
+            score_chunks.append(weight * np.asarray(segment.popularity[doc_ids], dtype=np.float64))
+
+        doc_ids, inverse = np.unique(np.concatenate(id_chunks), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_chunks))
+
+        if len(scores) > limit:
+            # Keep every candidate tied with the k-th score so the cut below follows corpus order.
+            threshold = -np.partition(-scores, limit - 1)[limit - 1]
+            top = np.flatnonzero(scores >= threshold)
+        else:
+            top = np.arange(len(scores))
+        # Highest score first; ties keep corpus order.
+        top = top[np.lexsort((doc_ids[top], -scores[top]))][:limit]
+        return [(float(scores[i]), self._document(int(doc_ids[i]))) for i in top]
+
+    def _document(self, doc_id: int) -> dict[str, Any]:
+        for segment in self.segments():
+            if doc_id < len(segment):
+                return segment.document(doc_id)
+            doc_id -= len(segment)
+        raise IndexError(doc_id)
+
+
+class SearchIndex(BaseSearchIndex):
+    """In-memory, appendable index; also the staging area for on-disk segments."""
+
+    def __init__(self) -> None:
+        self.documents: list[dict[str, Any]] = []
+        # term -> (doc ids, term frequencies), both in ascending doc id order.
+        self.postings: dict[str, tuple[array, array]] = {}
+        self.doc_freq: dict[str, int] = {}
+        # Per-document tables, rebuilt once per load so queries never recompute them.
+        self.doc_lengths = np.zeros(0, dtype=np.float64)
+        self.length_norms = np.zeros(0, dtype=np.float64)
+        self.popularity = np.zeros(0, dtype=np.float64)
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[dict[str, Any]],
+        tokenize: Callable[[str], list[str]] = tokenize,
+    ) -> "SearchIndex":
+        index = cls()
+        index.add_documents(documents, tokenize)
+        return index
+
+    def segments(self) -> list[Any]:
+        return [self]
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_documents(
+        self,
+        documents: Iterable[dict[str, Any]],
+        tokenize: Callable[[str], list[str]] = tokenize,
+    ) -> None:
+        lengths: list[int] = []
+        for doc in documents:
+            doc_id = len(self.documents)
+            self.documents.append(
+                {
+                    "title": doc.get("title", ""),
+                    "url": doc.get("url", ""),
+                    "ups": doc.get("ups", 0),
+                    "comments": doc.get("comments", 0),
+                }
+            )
+            tokens = tokenize(str(doc.get("text", "")))
+            lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                entry = self.postings.get(term)
+                if entry is None:
+                    entry = (array("I"), array("I"))
+                    self.postings[term] = entry
+                entry[0].append(doc_id)
+                entry[1].append(freq)
+                self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+        self._refresh_tables(lengths)
+
+    def _refresh_tables(self, new_lengths: list[int]) -> None:
+        self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(new_lengths, dtype=np.float64)])
+        avg_length = float(self.doc_lengths.mean()) if len(self.doc_lengths) else 0.0
+        self.length_norms = _length_norms(self.doc_lengths, avg_length)
+        ups = np.fromiter((doc["ups"] for doc in self.documents), dtype=np.float64, count=len(self.documents))
+        comments = np.fromiter((doc["comments"] for doc in self.documents), dtype=np.float64, count=len(self.documents))
+        self.popularity = np.log(ups + 1) + np.log(comments + 1)
+
+    def lookup(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        entry = self.postings.get(term)
+        if entry is None:
+            return None
+        return np.frombuffer(entry[0], dtype=np.uint32), np.frombuffer(entry[1], dtype=np.uint32)
+
+    def document(self, doc_id: int) -> dict[str, Any]:
+        return self.documents[doc_id]
+
+
+class MappedSegment:
+    """One read-only on-disk segment, memory-mapped so worker processes share its pages.
+
+    Files: ``terms.npy`` (sorted fixed-width ASCII terms), ``term_offsets.npy`` into
+    ``doc_ids.npy``/``freqs.npy``, ``doc_lengths.npy``, ``popularity.npy``, and
+    ``meta.bin`` (one JSON object per post) indexed by ``meta_offsets.npy``.
+    """
+
+    def __init__(self, directory: Path, avg_length: float) -> None:
+        self.directory = directory
+        self.terms = np.load(directory / "terms.npy", mmap_mode="r")
+        self.term_offsets = np.load(directory / "term_offsets.npy", mmap_mode="r")
+        self.doc_ids = np.load(directory / "doc_ids.npy", mmap_mode="r")
+        self.freqs = np.load(directory / "freqs.npy", mmap_mode="r")
+        self.doc_lengths = np.load(directory / "doc_lengths.npy", mmap_mode="r")
+        self.popularity = np.load(directory / "popularity.npy", mmap_mode="r")
+        self.meta_offsets = np.load(directory / "meta_offsets.npy", mmap_mode="r")
+        self.meta = np.memmap(directory / "meta.bin", dtype=np.uint8, mode="r")
+        # Depends on the average length across all segments, so it is derived per process.
+        self.length_norms = _length_norms(self.doc_lengths, avg_length)
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def lookup(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        key = term.encode("ascii", "ignore")
+        if not key or len(key) > self.terms.dtype.itemsize:
+            return None
+        position = int(np.searchsorted(self.terms, key))
+        if position >= len(self.terms) or self.terms[position] != key:
+            return None
+        start, end = int(self.term_offsets[position]), int(self.term_offsets[position + 1])
+        return self.doc_ids[start:end], self.freqs[start:end]
+
+    def document(self, doc_id: int) -> dict[str, Any]:
+        start, end = int(self.meta_offsets[doc_id]), int(self.meta_offsets[doc_id + 1])
+        return json.loads(self.meta[start:end].tobytes())
+
+
+class MappedSearchIndex(BaseSearchIndex):
+    """Read-only view over the segments listed in an index directory's manifest."""
+
+    def __init__(self, directory: Path, manifest: dict[str, Any], segments: list[MappedSegment]) -> None:
+        self.directory = directory
+        self.manifest = manifest
+        self._segments = segments
+
+    @classmethod
+    def open(cls, directory: str | Path) -> "MappedSearchIndex":
+        directory = Path(directory)
+        manifest = read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"no search index manifest in {directory}")
+        entries = manifest.get("segments", [])
+        total_docs = sum(int(entry["documents"]) for entry in entries)
+        total_length = sum(int(entry["total_length"]) for entry in entries)
+        avg_length = total_length / total_docs if total_docs else 0.0
+        segments = [MappedSegment(directory / str(entry["name"]), avg_length) for entry in entries]
+        return cls(directory, manifest, segments)
+
+    def segments(self) -> list[Any]:
+        return list(self._segments)
+
+
+def read_manifest(directory: Path) -> dict[str, Any] | None:
+    manifest_path = directory / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("format") != INDEX_FORMAT:
+        raise ValueError(f"unsupported search index format in {manifest_path}")
+    return manifest
@@ -1,71 +1,254 @@
-import json
-import re
-from collections import Counter
-from math import log
+import os
+import time
+from datetime import UTC, datetime
 from pathlib import Path
+from threading import Event, Lock, Thread
 from typing import Any
 
+from .index_builder import default_index_dir
+from .search_index import (
+    MANIFEST_NAME,
+    SCORERS,
+    BaseSearchIndex,
+    MappedSearchIndex,
+    SearchIndex,
+    load_dump_posts,
+    read_manifest,
+    tokenize,
+)
+from .singleflight import BlockingSingleFlight
+from .telemetry import SEARCH_DURATION, span
 
-def _tokenize(text: str) -> list[str]:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    return text.split()
+DEFAULT_SCORER = os.getenv("SEARCH_SCORER", "legacy").strip().lower() or "legacy"
+if DEFAULT_SCORER not in SCORERS:
+    raise ValueError(f"SEARCH_SCORER must be one of {list(SCORERS)}")
+
+INDEX_DIR = Path(os.getenv("SEARCH_INDEX_DIR", str(default_index_dir())))
+CORPUS_PATH = Path(__file__).resolve().parents[1] / "data" / "pmdd.json"
+WAIT_SECONDS = float(os.getenv("SEARCH_WAIT_SECONDS", "5"))
+WATCH_SECONDS = float(os.getenv("SEARCH_WATCH_SECONDS", "0"))
+
+
+class SearchIndexUnavailable(RuntimeError):
+    pass
+
+
+# Searches read `_index` once and keep that snapshot; loads and reloads build a new
+# index on their own thread and swap the reference under `_state_lock`.
+_index: BaseSearchIndex | None = None
+# Identifies the source `_index` was built from; it changes whenever a reload picks up new data.
+_index_version: str | None = None
+_loaded = Event()
+_state_lock = Lock()
+_reload_lock = Lock()
+_watcher_started = False
+_search_flights = BlockingSingleFlight()
+_status: dict[str, Any] = {
+    "state": "idle",
+    "documents": 0,
+    "load_seconds": None,
+    "error": None,
+    "reloading": False,
+    "reloads": 0,
+    "reload_failures": 0,
+    "last_reload_seconds": None,
+    "last_reload_at": None,
+    "last_reload_error": None,
+    "previous_documents": None,
+}
 
 
 def _load_documents() -> list[dict[str, Any]]:
-    repo_root = Path(__file__).resolve().parents[2]
-    json_path = repo_root / "backend" / "data" / "pmdd.json"
-    if not json_path.exists():
+    if not CORPUS_PATH.exists():
         return []
+    return load_dump_posts(CORPUS_PATH)
 
-    with json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    docs: list[dict[str, Any]] = []
-    for child in data.get("data", {}).get("children", []):
-        post = child.get("data", {})
-        title = post.get("title", "")
-        body = post.get("selftext", "")
-        text = f"{title} {body}".strip()
-        docs.append(
-            {
-                "title": title,
-                "text": text,
-                "url": post.get("url", ""),
-                "ups": post.get("ups", 0),
-                "comments": post.get("num_comments", 0),
-                "term_freq": Counter(_tokenize(text)),
-            }
-        )
-    return docs
+def _source_version() -> str:
+    manifest = INDEX_DIR / MANIFEST_NAME
+    source = manifest if manifest.exists() else CORPUS_PATH
+    try:
+        stat = source.stat()
+    except OSError:
+        return f"{source}:missing"
+    return f"{source}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _load_index() -> BaseSearchIndex:
+    # A prebuilt index (see backend.app.index_builder) is mapped read-only and shared
+    # between workers; otherwise the bundled dump is indexed in memory.
+    if read_manifest(INDEX_DIR) is not None:
+        return MappedSearchIndex.open(INDEX_DIR)
+    return SearchIndex.build(_load_documents(), tokenize)
+
+
+def _load_in_background() -> None:
+    global _index, _index_version
+    with _reload_lock:
+        start = time.perf_counter()
+        version = _source_version()
+        try:
+            index = _load_index()
+        except Exception as exc:
+            with _state_lock:
+                _status.update(state="failed", error=str(exc), load_seconds=round(time.perf_counter() - start, 3))
+            _loaded.set()
+            return
+
+        with _state_lock:
+            _index = index
+            _index_version = version
+            _status.update(
+                state="ready",
+                documents=len(index),
+                load_seconds=round(time.perf_counter() - start, 3),
+                error=None,
+            )
+        _loaded.set()
+
+
+def start_background_load() -> None:
+    """Start loading the corpus on a daemon thread unless it is loading or loaded."""
+    with _state_lock:
+        if _status["state"] in ("loading", "ready"):
+            return
+        _status.update(state="loading", error=None)
+        _loaded.clear()
+    Thread(target=_load_in_background, name="search-index-loader", daemon=True).start()
+
+
+def reload_index() -> dict[str, Any]:
+    """Rebuild the index from its source and atomically swap it in.
+
+    In-flight searches finish on the index they started with. A failed reload keeps
+    serving the current index.
+    """
+    global _index, _index_version
+    if not _reload_lock.acquire(blocking=False):
+        return {"status": "in_progress"}
+    try:
+        with _state_lock:
+            _status["reloading"] = True
+        start = time.perf_counter()
+        version = _source_version()
+        try:
+            index = _load_index()
+        except Exception as exc:
+            with _state_lock:
+                _status.update(reload_failures=_status["reload_failures"] + 1, last_reload_error=str(exc))
+            raise
+        seconds = round(time.perf_counter() - start, 3)
 
+        with _state_lock:
+            previous = len(_index) if _index is not None else 0
+            _index = index
+            _index_version = version
+            _status.update(
+                state="ready",
+                documents=len(index),
+                error=None,
+                reloads=_status["reloads"] + 1,
+                last_reload_seconds=seconds,
+                last_reload_at=datetime.now(UTC).isoformat(),
+                last_reload_error=None,
+                previous_documents=previous,
+            )
+        _loaded.set()
+        return {"status": "reloaded", "documents": len(index), "previous_documents": previous, "seconds": seconds}
+    finally:
+        with _state_lock:
+            _status["reloading"] = False
+        _reload_lock.release()
 
-DOCUMENTS = _load_documents()
 
+def start_background_reload() -> None:
+    def run() -> None:
+        try:
+            reload_index()
+        except Exception:
+            pass  # Recorded in search_status(); the previous index keeps serving.
 
-def search_posts(query: str, limit: int = 5) -> list[dict[str, Any]]:
+    Thread(target=run, name="search-index-reloader", daemon=True).start()
+
+
+def _source_mtime() -> float | None:
+    manifest = INDEX_DIR / MANIFEST_NAME
+    source = manifest if manifest.exists() else CORPUS_PATH
+    try:
+        return source.stat().st_mtime
+    except OSError:
+        return None
+
+
+def start_file_watcher(interval: float = WATCH_SECONDS) -> None:
+    """Poll the index manifest (or pmdd.json) and reload when it changes."""
+    global _watcher_started
+    with _state_lock:
+        if interval <= 0 or _watcher_started:
+            return
+        _watcher_started = True
+
+    def watch() -> None:
+        last_seen = _source_mtime()
+        while True:
+            time.sleep(interval)
+            current = _source_mtime()
+            if current is None or current == last_seen:
+                continue
+            last_seen = current
+            try:
+                reload_index()
+            except Exception:
+                pass  # Recorded in search_status(); retried on the next change.
+
+    Thread(target=watch, name="search-index-watcher", daemon=True).start()
+
+
+def index_version() -> str | None:
+    """The served index's source version, or None before the first load."""
+    with _state_lock:
+        return _index_version
+
+
+def search_status() -> dict[str, Any]:
+    with _state_lock:
+        return {**_status, "single_flight": dict(_search_flights.stats)}
+
+
+def _get_index(timeout: float | None) -> BaseSearchIndex:
+    start_background_load()
+    if not _loaded.wait(WAIT_SECONDS if timeout is None else timeout):
+        raise SearchIndexUnavailable("search index warming")
+    with _state_lock:
+        if _index is None:
+            raise SearchIndexUnavailable(f"search index failed to load: {_status['error']}")
+        return _index
+
+
+def search_posts(
+    query: str,
+    limit: int = 5,
+    scorer: str | None = None,
+    timeout: float | None = None,
+) -> list[dict[str, Any]]:
     if not query.strip():
         return []
 
-    query_tokens = _tokenize(query)
-    scored: list[tuple[float, dict[str, Any]]] = []
-
-    for doc in DOCUMENTS:
-        score = sum(doc["term_freq"].get(token, 0) for token in query_tokens)
-        if score <= 0:
-            continue
-        popularity_boost = log(doc["ups"] + 1) + log(doc["comments"] + 1)
-        final_score = score + 0.3 * popularity_boost
-        scored.append((final_score, doc))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [
-        {
-            "score": round(score, 3),
-            "title": doc["title"],
-            "url": doc["url"],
-            "ups": doc["ups"],
-            "comments": doc["comments"],
-        }
-        for score, doc in scored[:limit]
-    ]
+    with span("search", SEARCH_DURATION):
+        index = _get_index(timeout)
+        terms = tokenize(query)
+        scorer = scorer or DEFAULT_SCORER
+        # Concurrent searches for the same terms on the same index share one scan.
+        hits = _search_flights.run(
+            (id(index), tuple(terms), limit, scorer), lambda: index.search(terms, limit, scorer)
+        )
+        return [
+            {
+                "score": round(score, 3),
+                "title": doc["title"],
+                "url": doc["url"],
+                "ups": doc["ups"],
+                "comments": doc["comments"],
+            }
+            for score, doc in hits
+        ]
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from threading import Event, Lock
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class IdempotencyKeyReused(ValueError):
+    """An idempotency key was sent again with a different request."""
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task[Any]
+    fingerprint: str
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """Concurrent ``run`` calls with the same key share one task.
+
+    With ``replay_ttl`` the finished result is also kept (up to ``max_replays`` keys) and
+    returned to calls with that key for ``replay_ttl`` seconds. ``fingerprint`` identifies
+    the request behind a key; reusing a key with another fingerprint raises
+    IdempotencyKeyReused. The shared task is cancelled only when every caller waiting on
+    it has been cancelled.
+    """
+
+    def __init__(self, replay_ttl: float = 0.0, max_replays: int = 1024) -> None:
+        self.replay_ttl = replay_ttl
+        self.max_replays = max_replays
+        self._flights: dict[str, _Flight] = {}
+        self._replays: OrderedDict[str, tuple[float, str, T]] = OrderedDict()
+        self.stats = {"leaders": 0, "shared": 0, "replayed": 0}
+
+    def _replay(self, key: str, fingerprint: str) -> tuple[float, str, T] | None:
+        entry = self._replays.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._replays[key]
+            return None
+        if entry[1] != fingerprint:
+            raise IdempotencyKeyReused(key)
+        return entry
+
+    def _remember(self, key: str, fingerprint: str, task: asyncio.Task[Any]) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        if self.replay_ttl <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        self._replays[key] = (time.monotonic() + self.replay_ttl, fingerprint, task.result())
+        self._replays.move_to_end(key)
+        while len(self._replays) > self.max_replays:
+            self._replays.popitem(last=False)
+
+    async def run(self, key: str, work: Callable[[], Awaitable[T]], fingerprint: str = "") -> tuple[T, str]:
+        """Return ``work()``'s result and how it was obtained: ``leader``, ``shared`` or ``replayed``."""
+        replay = self._replay(key, fingerprint)
+        if replay is not None:
+            self.stats["replayed"] += 1
+            return replay[2], "replayed"
+
+        flight = self._flights.get(key)
+        # Tasks belong to one event loop, and a task being cancelled must not take new callers with it.
+        if (
+            flight is not None
+            and flight.task.get_loop() is asyncio.get_running_loop()
+            and not flight.task.cancelling()
+        ):
+            if flight.fingerprint != fingerprint:
+                raise IdempotencyKeyReused(key)
+            role = "shared"
+        else:
+            task = asyncio.ensure_future(work())
+            flight = self._flights[key] = _Flight(task, fingerprint)
+            task.add_done_callback(lambda done: self._remember(key, fingerprint, done))
+            role = "leader"
+        self.stats["leaders" if role == "leader" else "shared"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), role
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+
+@dataclass
+class _Call:
+    done: Event = field(default_factory=Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class BlockingSingleFlight:
+    """Thread-safe single-flight for blocking calls: concurrent ``run`` calls with the same
+    key wait for the first one and get its result (or exception)."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: dict[Any, _Call] = {}
+        self.stats = {"leaders": 0, "shared": 0}
+
+    def run(self, key: Any, work: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            self.stats["leaders" if leader else "shared"] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = work()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
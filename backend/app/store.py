@@ -1,63 +1,282 @@
 import json
+import queue
 import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from datetime import UTC, datetime
 from pathlib import Path
 from threading import Lock
 from typing import Any
 
+from .telemetry import STORE_DURATION, STORE_LOCK_WAIT, span
+
 
 SAVE_BUCKETS = {"journal", "definitions", "threads", "drafts", "audit_logs"}
+SESSION_FIELDS = (
+    "conversation_history",
+    "structured_symptom_list",
+    "active_agents",
+    "audit_log",
+    "saved",
+    "updated_at",
+)
+
+DEFAULT_POOL_SIZE = 16
+BUSY_TIMEOUT_MS = 5000
+# How long a caller waits for a free pooled connection before giving up.
+POOL_TIMEOUT_SECONDS = 5.0
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+# Applied to every pooled connection, after PRAGMA synchronous. The default NORMAL is
+# durable across application crashes in WAL mode; FULL also fsyncs the WAL on every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Schema migrations in order; a database at PRAGMA user_version N has had the first N
+# applied. Append new steps, never edit shipped ones.
+MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    (
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            structured_symptom_list TEXT NOT NULL DEFAULT '[]',
+            active_agents TEXT NOT NULL DEFAULT '[]',
+            updated_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS conversation_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS saved_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            item_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """,
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_conversation_history_session ON conversation_history (session_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_saved_items_session_bucket ON saved_items (session_id, bucket, id)",
+    ),
+    (
+        """
+        CREATE TABLE IF NOT EXISTS session_summaries (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            through_id INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS conversation_archive (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_conversation_archive_session ON conversation_archive (session_id, id)",
+    ),
+    (
+        """
+        CREATE TABLE IF NOT EXISTS supporting_results (
+            session_id TEXT NOT NULL,
+            turn_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result_json TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (session_id, turn_id)
+        )
+        """,
+    ),
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+class _ConnectionPool:
+    """Up to ``size`` connections, opened on demand and handed to one thread at a time."""
+
+    def __init__(self, db_path: Path, size: int, synchronous: str, timeout: float = POOL_TIMEOUT_SECONDS) -> None:
+        if size <= 0:
+            raise ValueError("pool size must be positive")
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"synchronous must be one of {list(SYNCHRONOUS_MODES)}")
+        self._db_path = db_path
+        self._pragmas = (f"PRAGMA synchronous={synchronous}", *CONNECTION_PRAGMAS)
+        self._size = size
+        self._timeout = timeout
+        self._opened = 0
+        self._lock = Lock()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in self._pragmas:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        wait_start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self._size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self._timeout)
+                except queue.Empty:
+                    STORE_LOCK_WAIT.observe(time.perf_counter() - wait_start, lock="pool")
+                    raise sqlite3.OperationalError(
+                        f"connection pool exhausted: no connection free after {self._timeout:g}s "
+                        f"(pool size {self._size})"
+                    ) from None
+        STORE_LOCK_WAIT.observe(time.perf_counter() - wait_start, lock="pool")
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+class SessionUnitOfWork:
+    """Mutations of one session, buffered until ``SessionStore.commit``."""
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.history: list[tuple[str, str]] = []
+        self.saved_items: list[tuple[str, dict[str, Any]]] = []
+        self.structured_symptom_list: list[str] | None = None
+        self.active_agents: list[str] | None = None
+
+    def append_history(self, role: str, content: str) -> None:
+        self.history.append((role, content))
+
+    def set_structured_symptom_list(self, symptoms: list[str]) -> None:
+        self.structured_symptom_list = list(symptoms)
+
+    def set_active_agents(self, agents: list[str]) -> None:
+        self.active_agents = list(agents)
+
+    def append_audit_log(self, item: dict[str, Any]) -> None:
+        self.saved_items.append(("audit_logs", item))
+
+    def save(self, bucket: str, item: dict[str, Any]) -> None:
+        if bucket not in SAVE_BUCKETS:
+            raise ValueError(f"bucket must be one of {sorted(SAVE_BUCKETS)}")
+        self.saved_items.append((bucket, item))
+
+    def is_empty(self) -> bool:
+        return (
+            not self.history
+            and not self.saved_items
+            and self.structured_symptom_list is None
+            and self.active_agents is None
+        )
 
 
 class SessionStore:
-    def __init__(self, db_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        db_path: str | Path | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        synchronous: str = "NORMAL",
+        pool_timeout: float = POOL_TIMEOUT_SECONDS,
+    ) -> None:
         default_path = Path(__file__).resolve().parents[1] / "data" / "local.db"
         self._db_path = Path(db_path) if db_path is not None else default_path
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._lock = Lock()
+        self._pool = _ConnectionPool(self._db_path, pool_size, synchronous, pool_timeout)
+        # WAL lets readers run alongside a writer, so only writers take this lock.
+        self._write_lock = Lock()
         self._initialize_schema()
 
-    def _connection(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self._db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        # One read transaction so multi-query reads see a single snapshot; the pool
+        # rolls it back when the connection is returned.
+        with span("store.read", STORE_DURATION, kind="read"), self._pool.connection() as conn:
+            conn.execute("BEGIN")
+            yield conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # Take the lock before a connection so queued writers don't hold pool slots.
+        # BEGIN IMMEDIATE claims the database write lock up front, which keeps other
+        # processes on the same file from deadlocking on a read-to-write upgrade.
+        with span("store.write", STORE_DURATION, kind="write"):
+            wait_start = time.perf_counter()
+            with self._write_lock:
+                STORE_LOCK_WAIT.observe(time.perf_counter() - wait_start, lock="write")
+                with self._pool.connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield conn
+                    except BaseException:
+                        conn.rollback()
+                        raise
+                    conn.commit()
+
+    def close(self) -> None:
+        """Close the idle pooled connections."""
+        self._pool.close()
 
     def _initialize_schema(self) -> None:
-        with self._lock:
-            with self._connection() as conn:
-                conn.execute("PRAGMA journal_mode=WAL")
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        session_id TEXT PRIMARY KEY,
-                        structured_symptom_list TEXT NOT NULL DEFAULT '[]',
-                        active_agents TEXT NOT NULL DEFAULT '[]',
-                        updated_at TEXT NOT NULL
-                    )
-                    """
-                )
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS conversation_history (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        role TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        created_at TEXT NOT NULL
-                    )
-                    """
-                )
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS saved_items (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        bucket TEXT NOT NULL,
-                        item_json TEXT NOT NULL,
-                        created_at TEXT NOT NULL
-                    )
-                    """
+        # Databases from before versioning report user_version 0 and already have the
+        # version 1 tables; those statements are idempotent, so they upgrade in place.
+        with self._write() as conn:
+            version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"{self._db_path} has schema version {version}; this code supports up to {SCHEMA_VERSION}"
                 )
+            for statements in MIGRATIONS[version:]:
+                for statement in statements:
+                    conn.execute(statement)
+            if version != SCHEMA_VERSION:
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def schema_version(self) -> int:
+        with self._read() as conn:
+            return int(conn.execute("PRAGMA user_version").fetchone()[0])
 
     def _ensure_session(self, conn: sqlite3.Connection, session_id: str) -> None:
         now = datetime.now(UTC).isoformat()
@@ -70,10 +289,27 @@ class SessionStore:
             (session_id, now),
         )
 
-    def get_session(self, session_id: str) -> dict[str, Any]:
-        with self._lock:
-            with self._connection() as conn:
+    def _ensure_session_exists(self, session_id: str) -> None:
+        # Only sessions seen for the first time need the writer.
+        with self._read() as conn:
+            exists = conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if exists is None:
+            with self._write() as conn:
                 self._ensure_session(conn, session_id)
+
+    def get_session(self, session_id: str, fields: Iterable[str] | None = None) -> dict[str, Any]:
+        """Load a session; ``fields`` limits the result (and the queries run) to those keys."""
+        selected = set(SESSION_FIELDS if fields is None else fields)
+        unknown = selected - set(SESSION_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown session fields {sorted(unknown)}; expected {list(SESSION_FIELDS)}")
+
+        self._ensure_session_exists(session_id)
+        session_row = None
+        history_rows: list[sqlite3.Row] = []
+        saved_rows: list[sqlite3.Row] = []
+        with self._read() as conn:
+            if selected & {"structured_symptom_list", "active_agents", "updated_at"}:
                 session_row = conn.execute(
                     """
                     SELECT structured_symptom_list, active_agents, updated_at
@@ -82,6 +318,7 @@ class SessionStore:
                     """,
                     (session_id,),
                 ).fetchone()
+            if "conversation_history" in selected:
                 history_rows = conn.execute(
                     """
                     SELECT role, content
@@ -91,6 +328,7 @@ class SessionStore:
                     """,
                     (session_id,),
                 ).fetchall()
+            if "saved" in selected:
                 saved_rows = conn.execute(
                     """
                     SELECT bucket, item_json
@@ -100,6 +338,16 @@ class SessionStore:
                     """,
                     (session_id,),
                 ).fetchall()
+            elif "audit_log" in selected:
+                saved_rows = conn.execute(
+                    """
+                    SELECT bucket, item_json
+                    FROM saved_items
+                    WHERE session_id = ? AND bucket = 'audit_logs'
+                    ORDER BY id ASC
+                    """,
+                    (session_id,),
+                ).fetchall()
 
         saved: dict[str, list[dict[str, Any]]] = {bucket: [] for bucket in SAVE_BUCKETS}
         for row in saved_rows:
@@ -111,7 +359,7 @@ class SessionStore:
             except json.JSONDecodeError:
                 continue
 
-        return {
+        session = {
             "conversation_history": [{"role": str(row["role"]), "content": str(row["content"])} for row in history_rows],
             "structured_symptom_list": json.loads(str(session_row["structured_symptom_list"])) if session_row else [],
             "active_agents": json.loads(str(session_row["active_agents"])) if session_row else [],
@@ -119,123 +367,334 @@ class SessionStore:
             "saved": saved,
             "updated_at": str(session_row["updated_at"]) if session_row else datetime.now(UTC).isoformat(),
         }
+        return {field: value for field, value in session.items() if field in selected}
 
-    def append_history(self, session_id: str, role: str, content: str) -> None:
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                now = datetime.now(UTC).isoformat()
-                conn.execute(
+    def recent_history(self, session_id: str, limit: int) -> list[dict[str, str]]:
+        """The last ``limit`` history messages, oldest first, without loading the rest of the session."""
+        if limit <= 0:
+            return []
+        with self._read() as conn:
+            rows = conn.execute(
+                """
+                SELECT role, content
+                FROM (
+                    SELECT id, role, content
+                    FROM conversation_history
+                    WHERE session_id = ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                )
+                ORDER BY id ASC
+                """,
+                (session_id, limit),
+            ).fetchall()
+        return [{"role": str(row["role"]), "content": str(row["content"])} for row in rows]
+
+    @contextmanager
+    def unit_of_work(self, session_id: str) -> Iterator["SessionUnitOfWork"]:
+        """Collect a session's mutations and commit them in one transaction on exit.
+
+        Nothing is written if the block raises.
+        """
+        work = SessionUnitOfWork(session_id)
+        yield work
+        self.commit(work)
+
+    def commit(self, work: "SessionUnitOfWork") -> None:
+        if work.is_empty():
+            return
+        now = datetime.now(UTC).isoformat()
+        assignments = ["updated_at = ?"]
+        values: list[Any] = [now]
+        if work.structured_symptom_list is not None:
+            assignments.append("structured_symptom_list = ?")
+            values.append(json.dumps(work.structured_symptom_list, ensure_ascii=True))
+        if work.active_agents is not None:
+            assignments.append("active_agents = ?")
+            values.append(json.dumps(work.active_agents, ensure_ascii=True))
+
+        with self._write() as conn:
+            self._ensure_session(conn, work.session_id)
+            if work.history:
+                conn.executemany(
                     """
                     INSERT INTO conversation_history (session_id, role, content, created_at)
                     VALUES (?, ?, ?, ?)
                     """,
-                    (session_id, role, content, now),
+                    [(work.session_id, role, content, now) for role, content in work.history],
                 )
-                conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
-
-    def set_structured_symptom_list(self, session_id: str, symptoms: list[str]) -> None:
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                now = datetime.now(UTC).isoformat()
-                conn.execute(
+            if work.saved_items:
+                conn.executemany(
                     """
-                    UPDATE sessions
-                    SET structured_symptom_list = ?, updated_at = ?
-                    WHERE session_id = ?
+                    INSERT INTO saved_items (session_id, bucket, item_json, created_at)
+                    VALUES (?, ?, ?, ?)
                     """,
-                    (json.dumps(symptoms, ensure_ascii=True), now, session_id),
+                    [
+                        (work.session_id, bucket, json.dumps(item, ensure_ascii=True), now)
+                        for bucket, item in work.saved_items
+                    ],
                 )
+            conn.execute(
+                f"UPDATE sessions SET {', '.join(assignments)} WHERE session_id = ?",
+                (*values, work.session_id),
+            )
+
+    def append_history(self, session_id: str, role: str, content: str) -> None:
+        with self.unit_of_work(session_id) as work:
+            work.append_history(role, content)
+
+    def set_structured_symptom_list(self, session_id: str, symptoms: list[str]) -> None:
+        with self.unit_of_work(session_id) as work:
+            work.set_structured_symptom_list(symptoms)
 
     def set_active_agents(self, session_id: str, agents: list[str]) -> None:
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                now = datetime.now(UTC).isoformat()
-                conn.execute(
-                    """
-                    UPDATE sessions
-                    SET active_agents = ?, updated_at = ?
-                    WHERE session_id = ?
-                    """,
-                    (json.dumps(agents, ensure_ascii=True), now, session_id),
-                )
+        with self.unit_of_work(session_id) as work:
+            work.set_active_agents(agents)
 
     def append_audit_log(self, session_id: str, item: dict[str, Any]) -> None:
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                now = datetime.now(UTC).isoformat()
-                conn.execute(
-                    """
-                    INSERT INTO saved_items (session_id, bucket, item_json, created_at)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (session_id, "audit_logs", json.dumps(item, ensure_ascii=True), now),
-                )
-                conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
+        with self.unit_of_work(session_id) as work:
+            work.append_audit_log(item)
 
     def save(self, session_id: str, bucket: str, item: dict[str, Any]) -> None:
+        with self.unit_of_work(session_id) as work:
+            work.save(bucket, item)
+
+    def list_saved(
+        self,
+        session_id: str,
+        bucket: str,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        return self.list_saved_page(session_id, bucket, after, limit)[0]
+
+    def list_saved_page(
+        self,
+        session_id: str,
+        bucket: str,
+        after: int | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Items saved after the row id ``after``, oldest first, and the cursor for the next page.
+
+        The cursor is ``None`` once the bucket is exhausted; ``limit=None`` returns everything.
+        """
         if bucket not in SAVE_BUCKETS:
             raise ValueError(f"bucket must be one of {sorted(SAVE_BUCKETS)}")
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                now = datetime.now(UTC).isoformat()
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be positive")
+        self._ensure_session_exists(session_id)
+        with self._read() as conn:
+            # One extra row tells whether another page exists.
+            rows = self._saved_rows(conn, session_id, bucket, after, None if limit is None else limit + 1)
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = int(rows[-1]["id"])
+        return [item for _, item in _decode_saved(rows)], next_cursor
+
+    def iter_saved(
+        self,
+        session_id: str,
+        bucket: str,
+        after: int | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield ``(id, item)`` for a whole bucket in keyset batches.
+
+        Each batch is a short read of its own, so memory stays at one batch and a slow
+        consumer never holds a pooled connection or pins the WAL.
+        """
+        if bucket not in SAVE_BUCKETS:
+            raise ValueError(f"bucket must be one of {sorted(SAVE_BUCKETS)}")
+        while True:
+            with self._read() as conn:
+                rows = self._saved_rows(conn, session_id, bucket, after, batch_size)
+            if not rows:
+                return
+            yield from _decode_saved(rows)
+            if len(rows) < batch_size:
+                return
+            after = int(rows[-1]["id"])
+
+    def _saved_rows(
+        self,
+        conn: sqlite3.Connection,
+        session_id: str,
+        bucket: str,
+        after: int | None,
+        limit: int | None,
+    ) -> list[sqlite3.Row]:
+        return conn.execute(
+            """
+            SELECT id, item_json
+            FROM saved_items
+            WHERE session_id = ? AND bucket = ? AND id > ?
+            ORDER BY id ASC
+            LIMIT ?
+            """,
+            (session_id, bucket, after or 0, -1 if limit is None else limit),
+        ).fetchall()
+
+    def get_summary(self, session_id: str) -> dict[str, Any] | None:
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT summary, through_id, updated_at FROM session_summaries WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"summary": str(row["summary"]), "through_id": int(row["through_id"]), "updated_at": str(row["updated_at"])}
+
+    def compaction_candidates(self, session_id: str, keep: int) -> list[dict[str, Any]]:
+        """History messages older than the newest ``keep``, oldest first, with their row ids."""
+        if keep <= 0:
+            raise ValueError("keep must be positive")
+        with self._read() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, role, content
+                FROM conversation_history
+                WHERE session_id = ? AND id < (
+                    SELECT MIN(id) FROM (
+                        SELECT id FROM conversation_history WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                    )
+                )
+                ORDER BY id ASC
+                """,
+                (session_id, session_id, keep),
+            ).fetchall()
+        return [{"id": int(row["id"]), "role": str(row["role"]), "content": str(row["content"])} for row in rows]
+
+    def compact_history(
+        self,
+        session_id: str,
+        summary: str,
+        through_id: int,
+        previous_through_id: int | None,
+        archive: bool = True,
+    ) -> bool:
+        """Store ``summary`` as covering history up to ``through_id`` and drop those rows from the hot table.
+
+        With ``archive`` the rows are copied to ``conversation_archive`` first. Returns False without
+        writing if another compaction has moved the summary since ``previous_through_id`` was read.
+        """
+        now = datetime.now(UTC).isoformat()
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT through_id FROM session_summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if (int(row["through_id"]) if row else None) != previous_through_id:
+                return False
+            if archive:
                 conn.execute(
                     """
-                    INSERT INTO saved_items (session_id, bucket, item_json, created_at)
-                    VALUES (?, ?, ?, ?)
+                    INSERT OR IGNORE INTO conversation_archive (id, session_id, role, content, created_at, archived_at)
+                    SELECT id, session_id, role, content, created_at, ?
+                    FROM conversation_history
+                    WHERE session_id = ? AND id <= ?
                     """,
-                    (session_id, bucket, json.dumps(item, ensure_ascii=True), now),
+                    (now, session_id, through_id),
                 )
-                conn.execute("UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id))
+            conn.execute("DELETE FROM conversation_history WHERE session_id = ? AND id <= ?", (session_id, through_id))
+            conn.execute(
+                """
+                INSERT INTO session_summaries (session_id, summary, through_id, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    summary = excluded.summary, through_id = excluded.through_id, updated_at = excluded.updated_at
+                """,
+                (session_id, summary, through_id, now),
+            )
+        return True
 
-    def list_saved(self, session_id: str, bucket: str) -> list[dict[str, Any]]:
-        if bucket not in SAVE_BUCKETS:
-            raise ValueError(f"bucket must be one of {sorted(SAVE_BUCKETS)}")
-        with self._lock:
-            with self._connection() as conn:
-                self._ensure_session(conn, session_id)
-                rows = conn.execute(
+    def set_supporting_result(
+        self,
+        session_id: str,
+        turn_id: str,
+        status: str,
+        result: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a turn's background supporting-node status; a ``pending`` status never overwrites a result."""
+        now = datetime.now(UTC).isoformat()
+        result_json = json.dumps(result, ensure_ascii=True) if result is not None else None
+        with self._write() as conn:
+            if status == "pending":
+                conn.execute(
                     """
-                    SELECT item_json
-                    FROM saved_items
-                    WHERE session_id = ? AND bucket = ?
-                    ORDER BY id ASC
+                    INSERT OR IGNORE INTO supporting_results (session_id, turn_id, status, result_json, updated_at)
+                    VALUES (?, ?, ?, NULL, ?)
                     """,
-                    (session_id, bucket),
-                ).fetchall()
+                    (session_id, turn_id, status, now),
+                )
+                return
+            conn.execute(
+                """
+                INSERT INTO supporting_results (session_id, turn_id, status, result_json, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(session_id, turn_id) DO UPDATE SET
+                    status = excluded.status, result_json = excluded.result_json, updated_at = excluded.updated_at
+                """,
+                (session_id, turn_id, status, result_json, now),
+            )
 
-        items: list[dict[str, Any]] = []
-        for row in rows:
-            try:
-                parsed = json.loads(str(row["item_json"]))
-            except json.JSONDecodeError:
-                continue
-            if isinstance(parsed, dict):
-                items.append(parsed)
-        return items
+    def get_supporting_result(self, session_id: str, turn_id: str) -> dict[str, Any] | None:
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT status, result_json, updated_at FROM supporting_results WHERE session_id = ? AND turn_id = ?",
+                (session_id, turn_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "status": str(row["status"]),
+            "result": json.loads(str(row["result_json"])) if row["result_json"] is not None else None,
+            "updated_at": str(row["updated_at"]),
+        }
 
     def delete_session(self, session_id: str) -> dict[str, int]:
-        with self._lock:
-            with self._connection() as conn:
-                history_deleted = conn.execute(
-                    "DELETE FROM conversation_history WHERE session_id = ?",
-                    (session_id,),
-                ).rowcount
-                saved_deleted = conn.execute(
-                    "DELETE FROM saved_items WHERE session_id = ?",
-                    (session_id,),
-                ).rowcount
-                sessions_deleted = conn.execute(
-                    "DELETE FROM sessions WHERE session_id = ?",
-                    (session_id,),
-                ).rowcount
+        with self._write() as conn:
+            history_deleted = conn.execute(
+                "DELETE FROM conversation_history WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
+            archive_deleted = conn.execute(
+                "DELETE FROM conversation_archive WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
+            summaries_deleted = conn.execute(
+                "DELETE FROM session_summaries WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
+            saved_deleted = conn.execute(
+                "DELETE FROM saved_items WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
+            supporting_deleted = conn.execute(
+                "DELETE FROM supporting_results WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
+            sessions_deleted = conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).rowcount
 
         return {
             "conversation_history": int(history_deleted or 0),
+            "conversation_archive": int(archive_deleted or 0),
+            "session_summaries": int(summaries_deleted or 0),
             "saved_items": int(saved_deleted or 0),
+            "supporting_results": int(supporting_deleted or 0),
             "sessions": int(sessions_deleted or 0),
         }
+
+
+def _decode_saved(rows: list[sqlite3.Row]) -> Iterator[tuple[int, dict[str, Any]]]:
+    for row in rows:
+        try:
+            parsed = json.loads(str(row["item_json"]))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            yield int(row["id"]), parsed
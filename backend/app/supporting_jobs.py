@@ -0,0 +1,102 @@
+import asyncio
+import os
+import weakref
+from collections.abc import Awaitable, Callable
+from threading import Lock
+from typing import Any
+
+SUPPORTING_MODES = ("inline", "background")
+
+# inline: a turn waits for its supporting nodes (the original behaviour).
+# background: the turn returns after the leader and auditor; the supporting nodes finish
+# as background jobs, at most SUPPORTING_WORKERS at a time, and are fetched separately.
+SUPPORTING_MODE = os.getenv("SUPPORTING_MODE", "inline").strip().lower() or "inline"
+SUPPORTING_WORKERS = int(os.getenv("SUPPORTING_WORKERS", "8"))
+# At shutdown, jobs get this long to finish before they are cancelled and reported as failed.
+SUPPORTING_DRAIN_SECONDS = float(os.getenv("SUPPORTING_DRAIN_SECONDS", "10"))
+
+ResultHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+_state_lock = Lock()
+_background: dict[asyncio.Task[Any], ResultHandler | None] = {}
+# asyncio primitives belong to one event loop, so each loop gets its own worker slots.
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_status = {"scheduled": 0, "completed": 0, "failed": 0, "cancelled": 0, "result_errors": 0}
+
+
+def _count(key: str) -> None:
+    with _state_lock:
+        _status[key] += 1
+
+
+def _slot(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    with _state_lock:
+        semaphore = _slots.get(loop)
+        if semaphore is None:
+            semaphore = _slots[loop] = asyncio.Semaphore(SUPPORTING_WORKERS)
+        return semaphore
+
+
+async def _run_job(
+    job: Callable[[], Awaitable[dict[str, Any]]],
+    on_result: ResultHandler | None,
+) -> None:
+    try:
+        async with _slot(asyncio.get_running_loop()):
+            try:
+                result = {"status": "done", **await job()}
+            except Exception as exc:
+                result = {"status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+    except asyncio.CancelledError:
+        _count("cancelled")
+        raise
+    _count("completed" if result["status"] == "done" else "failed")
+    await _report(on_result, result)
+
+
+async def _report(on_result: ResultHandler | None, result: dict[str, Any]) -> None:
+    if on_result is None:
+        return
+    try:
+        await on_result(result)
+    except Exception:
+        _count("result_errors")
+
+
+def schedule_supporting_job(
+    job: Callable[[], Awaitable[dict[str, Any]]],
+    on_result: ResultHandler | None = None,
+) -> asyncio.Task[None]:
+    """Run ``job()`` once a worker slot frees up, then pass ``{"status": ..., **output}`` to ``on_result``.
+
+    The status is ``done``, or ``failed`` with an ``error``. Cancelling the returned task drops the job.
+    """
+    task = asyncio.get_running_loop().create_task(_run_job(job, on_result))
+    _background[task] = on_result
+    task.add_done_callback(lambda done: _background.pop(done, None))
+    _count("scheduled")
+    return task
+
+
+async def drain_supporting_jobs(timeout: float | None = None) -> int:
+    """Wait for the jobs started on this loop, e.g. before a loop closes or the server stops.
+
+    Jobs still running after ``timeout`` seconds are cancelled and reported to their
+    ``on_result`` as ``failed``, so their turns do not stay pending. Returns how many were cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    pending = {task: on_result for task, on_result in list(_background.items()) if task.get_loop() is loop}
+    if not pending:
+        return 0
+    _, unfinished = await asyncio.wait(pending, timeout=timeout)
+    for task in unfinished:
+        task.cancel()
+    await asyncio.gather(*unfinished, return_exceptions=True)
+    for task in unfinished:
+        await _report(pending[task], {"status": "failed", "error": "cancelled: the server shut down first"})
+    return len(unfinished)
+
+
+def supporting_status() -> dict[str, Any]:
+    with _state_lock:
+        return {"mode": SUPPORTING_MODE, "workers": SUPPORTING_WORKERS, "in_flight": len(_background), **_status}
@@ -0,0 +1,215 @@
+import bisect
+import itertools
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any
+
+# Seconds; covers SQLite calls (sub-millisecond) up to slow multi-call chat turns.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TRACE_HEADER = "x-debug-trace"
+MAX_TRACE_SPANS = 500
+
+_metrics: list["Counter | Histogram"] = []
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = Lock()
+        _metrics.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_label_text(self.labels, key)} {value:g}" for key, value in sorted(values.items()))
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: a count per bucket (the last one is +Inf), the sum and the total count.
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = Lock()
+        _metrics.append(self)
+
+    def observe(self, seconds: float, **labels: Any) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += seconds
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = {key: (list(counts), total[0]) for key, (counts, total) in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _label_text(self.labels, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+        return lines
+
+
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+ORCHESTRATION_DURATION = Histogram("orchestration_duration_seconds", "Node graph wall time per chat turn.")
+NODE_DURATION = Histogram("node_duration_seconds", "Wall time of each graph node.", ("node",))
+NODE_ERRORS = Counter("node_errors_total", "Graph nodes that raised, by exception type.", ("node", "error"))
+LLM_CALL_DURATION = Histogram("llm_call_duration_seconds", "Model calls per node; cache hits never reach the model.", ("node", "cache"))
+LLM_RETRY_COUNT = Counter("llm_retries_total", "Model calls retried after an error.", ("node",))
+LLM_HEDGES = Counter("llm_hedges_total", "Hedged duplicate model calls, by which call answered first.", ("node", "winner"))
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens sent to and received from the model.", ("node", "kind"))
+STORE_DURATION = Histogram("store_transaction_duration_seconds", "SessionStore transactions.", ("kind",))
+STORE_LOCK_WAIT = Histogram("store_lock_wait_seconds", "Time waiting for the writer lock or a pooled connection.", ("lock",))
+SEARCH_DURATION = Histogram("search_duration_seconds", "search_posts latency.")
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class Trace:
+    origin: float = field(default_factory=time.perf_counter)
+    spans: list[dict[str, Any]] = field(default_factory=list)
+    dropped: int = 0
+    _ids: Iterator[int] = field(default_factory=itertools.count)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "elapsed_ms": round((time.perf_counter() - self.origin) * 1000, 2),
+            "spans": sorted(self.spans, key=lambda item: item["start_ms"]),
+            "dropped_spans": self.dropped,
+        }
+
+
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_parent: ContextVar[int | None] = ContextVar("trace_parent", default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+class span:
+    """Time a block: observed in ``histogram`` (labelled from ``attrs``) and, when the
+    request is being traced, recorded as a span under the enclosing one.
+
+    Context variables follow tasks and ``to_thread`` calls, so spans nest across them.
+    Without a trace this costs two clock reads and the histogram update.
+    """
+
+    __slots__ = ("name", "histogram", "attrs", "trace", "record", "token", "start")
+
+    def __init__(self, name: str, histogram: Histogram | None = None, **attrs: Any) -> None:
+        self.name = name
+        self.histogram = histogram
+        self.attrs = attrs
+
+    def __enter__(self) -> None:
+        self.trace = trace = _trace.get()
+        if trace is not None:
+            self.record = {"id": next(trace._ids), "parent": _parent.get(), "name": self.name, **self.attrs}
+            self.token = _parent.set(self.record["id"])
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        end = time.perf_counter()
+        if self.histogram is not None:
+            self.histogram.observe(end - self.start, **self.attrs)
+        trace = self.trace
+        if trace is not None:
+            _parent.reset(self.token)
+            record = self.record
+            if exc_type is not None:
+                record["error"] = exc_type.__name__
+            record["start_ms"] = round((self.start - trace.origin) * 1000, 2)
+            record["duration_ms"] = round((end - self.start) * 1000, 2)
+            if len(trace.spans) < MAX_TRACE_SPANS:
+                trace.spans.append(record)
+            else:
+                trace.dropped += 1
+
+
+class TelemetryMiddleware:
+    """ASGI middleware timing every request, and starting a trace when the debug header asks for one."""
+
+    def __init__(self, app: Any, trace_allowed: Callable[[dict[str, str]], bool] = lambda headers: True) -> None:
+        self.app = app
+        self.trace_allowed = trace_allowed
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        traced = headers.get(TRACE_HEADER, "").lower() in {"1", "true", "yes"} and self.trace_allowed(headers)
+        token = _trace.set(Trace()) if traced else None
+        status = 500
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # The route template, not the raw path, keeps label cardinality bounded.
+            HTTP_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+            if token is not None:
+                _trace.reset(token)
@@ -0,0 +1,106 @@
+import argparse
+import random
+import re
+import statistics
+import time
+from collections.abc import Callable
+
+from backend.app.audit_rules import Rule, RuleEngine, get_rule_engine
+
+from .common import percentile
+
+WORDS = [
+    "cramps", "fatigue", "bloating", "sleep", "mood", "cycle", "pain", "headache", "nausea", "anxiety",
+    "doctor", "week", "days", "before", "after", "really", "hard", "work", "energy", "appetite",
+    "period", "symptoms", "tracking", "journal", "notes", "feel", "worse", "better", "morning", "night",
+]
+
+
+def _rules(count: int, pattern_share: float, seed: int) -> list[Rule]:
+    rng = random.Random(seed)
+    rules: list[Rule] = []
+    for index in range(count):
+        if rng.random() < pattern_share:
+            word = rng.choice(WORDS)
+            pattern = rf"\b{word}\w* (?:is|was|gets) (?:\w+ ){{0,2}}\d{{{rng.randint(2, 3)}}}\b"
+            rules.append(Rule(f"pattern-{index}", "synthetic", "medium", pattern=pattern))
+        else:
+            phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + f" x{index}"
+            rules.append(Rule(f"phrase-{index}", "synthetic", "low", phrases=(phrase,)))
+    return rules
+
+
+def _texts(count: int, size: int, rules: list[Rule], seed: int) -> list[str]:
+    rng = random.Random(seed)
+    planted = [rule.phrases[0] for rule in rules if rule.phrases]
+    texts: list[str] = []
+    for _ in range(count):
+        words: list[str] = []
+        length = 0
+        while length < size:
+            word = rng.choice(planted) if rng.random() < 0.01 else rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        texts.append(" ".join(words)[:size])
+    return texts
+
+
+def _per_rule_scanner(rules: list[Rule]) -> Callable[[str], int]:
+    # The previous approach: one compiled regex per rule, each scanning the whole text.
+    compiled = [
+        re.compile(rule.pattern or r"(?<!\w)" + r"\s+".join(map(re.escape, rule.phrases[0].split())) + r"(?!\w)")
+        for rule in rules
+    ]
+
+    def scan(text: str) -> int:
+        lowered = text.lower()
+        return sum(1 for regex in compiled for _ in regex.finditer(lowered))
+
+    return scan
+
+
+def _time(scan: Callable[[str], object], texts: list[str]) -> list[float]:
+    samples: list[float] = []
+    for text in texts:
+        start = time.perf_counter()
+        scan(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Single-pass rule engine vs one regex per rule.")
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument(
+        "--pattern-shares", type=float, nargs="+", default=[0.0, 0.2], help="share of regex rules; the rest are phrases"
+    )
+    parser.add_argument("--text-bytes", type=int, default=10_000)
+    parser.add_argument("--texts", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.rules} rules, {args.texts} texts x {args.text_bytes} bytes")
+    print(f"{'regex share':>11} {'scanner':>20} {'p50 ms':>9} {'p95 ms':>9} {'MB/s':>8} {'matches':>8}")
+    for share in args.pattern_shares:
+        rules = _rules(args.rules, share, seed=7)
+        texts = _texts(args.texts, args.text_bytes, rules, seed=11)
+        start = time.perf_counter()
+        engine = RuleEngine(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        # Both report each rule's matches as if it scanned alone, so the totals agree.
+        for label, scan in (("per-rule regexes", _per_rule_scanner(rules)), ("single-pass engine", engine.scan)):
+            samples = _time(scan, texts)
+            matches = sum(scan(text) if label.startswith("per-rule") else len(scan(text)) for text in texts[:5])
+            throughput = args.text_bytes / 1e6 / (statistics.mean(samples) / 1000)
+            print(
+                f"{share:>11.0%} {label:>20} {statistics.median(samples):>9.3f} {percentile(samples, 95):>9.3f} "
+                f"{throughput:>8.1f} {matches:>8}"
+            )
+        print(f"{'':>11} {'engine compile':>20} {compile_ms:>9.1f}")
+
+    shipped = get_rule_engine()
+    samples = _time(shipped.scan, texts)
+    print(f"{'shipped':>11} {f'{len(shipped.rules)} rules':>20} {statistics.median(samples):>9.3f} {percentile(samples, 95):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+
+from backend.app import main
+from backend.app.agents import HISTORY_WINDOW, run_orchestration
+from backend.app.store import SessionStore
+
+from .common import drive
+from .stub_llm import StubLLMProcess
+
+
+def _blocking_app() -> FastAPI:
+    # The previous design: a sync endpoint that holds a threadpool worker for the
+    # whole orchestration.
+    app = FastAPI()
+
+    @app.post("/chat")
+    def chat(req: main.ChatRequest) -> dict[str, object]:
+        history = main.store.recent_history(req.session_id, HISTORY_WINDOW - 1)
+        history.append({"role": "user", "content": req.message})
+        orchestration = run_orchestration(
+            message=req.message,
+            model_name=req.model_name,
+            conversation_history=history,
+            active_agent=req.active_agent,
+            enabled_agents=req.enabled_agents,
+            search_query=req.search_query,
+            use_cache=not req.bypass_cache,
+        )
+        turn_id = uuid.uuid4().hex
+        main._persist_turn(req, orchestration, turn_id)
+        return main._chat_response(req, orchestration, turn_id)
+
+    return app
+
+
+def _chat_operation(client: httpx.AsyncClient) -> Callable[[int], Awaitable[None]]:
+    async def chat(number: int) -> None:
+        response = await client.post(
+            "/chat",
+            json={
+                "message": "cramps and fatigue before my period",
+                "active_agent": "yapper",
+                "session_id": f"load-{number}",
+                # Every client sends the same text; measure the LLM path, not the node cache.
+                "bypass_cache": True,
+            },
+        )
+        response.raise_for_status()
+
+    return chat
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent /chat load against a stub LLM, sync vs async endpoint.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--requests-per-client", type=int, default=2)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds per stub LLM call")
+    args = parser.parse_args()
+
+    server = StubLLMProcess(latency=args.llm_latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    async def run_all() -> None:
+        apps = {"sync": _blocking_app(), "async": main.app}
+        print(
+            f"{'endpoint':>8} {'clients':>8} {'chats/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'peak LLM calls':>15} "
+            f"{'errors':>7}"
+        )
+        for concurrency in args.concurrency:
+            for name, app in apps.items():
+                server.reset_stats()
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                    row = await drive(_chat_operation(client), concurrency, concurrency * args.requests_per_client)
+                print(
+                    f"{name:>8} {concurrency:>8} {row['throughput_rps']:>8.1f} {row['p50_ms'] or 0:>8.0f} "
+                    f"{row['p95_ms'] or 0:>8.0f} {server.stats()['peak_in_flight']:>15} {sum(row['errors'].values()):>7}"
+                )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.store = SessionStore(Path(tmp) / "load.db")
+        # One event loop for every run: the async LLM clients keep pooled connections bound to it.
+        asyncio.run(run_all())
+    server.stop()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import statistics
+import time
+
+from langchain.agents import create_agent
+from langchain_openai import ChatOpenAI
+
+from backend.app import agents
+
+from .common import percentile
+from .stub_llm import StubLLMServer
+
+
+def _per_call_construction(model_name: str, system_prompt: str, user_content: str) -> None:
+    # What every node invocation used to do: read the key, build a client, compile a graph.
+    model = ChatOpenAI(model=model_name, temperature=0.2, api_key=agents._read_openai_api_key())
+    agent = create_agent(model, tools=[], system_prompt=system_prompt)
+    agent.invoke({"messages": [{"role": "user", "content": user_content}]})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call overhead of rebuilding LLM clients and agents.")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    args = parser.parse_args()
+
+    server = StubLLMServer().start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+    agents.invalidate_clients()
+
+    modes = {
+        "per-call": lambda: _per_call_construction(args.model, agents.DEFINER_PROMPT, "hello"),
+        "registry": lambda: agents._invoke_node(agents.DEFINER_PROMPT, args.model, "hello"),
+    }
+    print(f"{'mode':>9} {'mean ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'connections':>12}")
+    for name, call in modes.items():
+        call()  # warm imports and, for the registry, the cached client and agent
+        server.reset_stats()
+        samples: list[float] = []
+        for _ in range(args.calls):
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{name:>9} {statistics.mean(samples):>8.2f} {statistics.median(samples):>7.2f} "
+            f"{percentile(samples, 95):>7.2f} {server.connections:>12}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
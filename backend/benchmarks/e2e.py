@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import tempfile
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from backend.app import main
+from backend.app.agents import register_model_provider, set_model_provider
+from backend.app.fake_llm import LATENCY_DISTRIBUTIONS, FakeChatModel
+from backend.app.search_tool import search_posts
+from backend.app.store import SessionStore
+
+from .common import drive
+from .synthetic import TOPIC_TERMS
+
+SCENARIOS = ("chat", "search", "store")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _chat_operation(client: httpx.AsyncClient, args: argparse.Namespace) -> Callable[[int], Awaitable[None]]:
+    async def chat(number: int) -> None:
+        term = TOPIC_TERMS[number % len(TOPIC_TERMS)]
+        response = await client.post(
+            "/chat",
+            json={
+                "message": f"I get {term} and fatigue the week before my period",
+                "active_agent": "yapper",
+                "session_id": f"e2e-{number % args.sessions}",
+                "bypass_cache": not args.use_cache,
+                "leader_mode": args.leader_mode,
+                "supporting_mode": args.supporting_mode,
+            },
+        )
+        response.raise_for_status()
+
+    return chat
+
+
+def _search_operation(client: httpx.AsyncClient) -> Callable[[int], Awaitable[None]]:
+    async def search(number: int) -> None:
+        response = await client.post("/search", json={"query": TOPIC_TERMS[number % len(TOPIC_TERMS)], "limit": 5})
+        response.raise_for_status()
+
+    return search
+
+
+def _store_operation(store: SessionStore, sessions: int) -> Callable[[int], Awaitable[None]]:
+    # One persisted turn plus the history read the next turn would make.
+    def turn(number: int) -> None:
+        session_id = f"e2e-store-{number % sessions}"
+        with store.unit_of_work(session_id) as work:
+            work.append_history("user", "cramps again today")
+            work.append_history("assistant", "Thanks for the update.")
+            work.append_audit_log({"flagged_segments": []})
+        store.recent_history(session_id, 7)
+
+    async def run(number: int) -> None:
+        await asyncio.to_thread(turn, number)
+
+    return run
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(row["scenario"], row["concurrency"]): row for row in baseline["results"]}
+    print(f"\ncompared with {baseline_path} ({baseline['meta'].get('git_revision')})")
+    print(f"{'scenario':>8} {'clients':>8} {'p50 ms':>16} {'p99 ms':>16} {'req/s':>16}")
+    for row in results:
+        old = previous.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms", "throughput_rps"):
+            if old[key] and row[key]:
+                cells.append(f"{row[key]:.1f} ({(row[key] - old[key]) / old[key]:+.0%})")
+            else:
+                cells.append("n/a")
+        print(f"{row['scenario']:>8} {row['concurrency']:>8} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end /chat, /search and store benchmarks on the fake LLM.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency level")
+    parser.add_argument("--chat-requests", type=int, default=64, help="requests per level for the chat scenario")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median fake LLM latency per call")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=443)
+    parser.add_argument("--leader-mode", choices=["two_pass", "single_pass"], default="two_pass")
+    parser.add_argument("--supporting-mode", choices=["inline", "background"], default="inline")
+    parser.add_argument("--use-cache", action="store_true", help="let repeated prompts hit the node response cache")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/e2e-<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    fake_settings = {
+        "latency_ms": args.latency_ms,
+        "latency_distribution": args.latency_dist,
+        "latency_sigma": args.latency_sigma,
+        "tokens_per_second": args.tokens_per_second,
+        "failure_rate": args.failure_rate,
+        "malformed_rate": args.malformed_rate,
+        "seed": args.seed,
+    }
+    register_model_provider("bench-fake", lambda model_name: FakeChatModel(model_name=model_name, **fake_settings))
+    set_model_provider("bench-fake")
+
+    async def run_all(store: SessionStore) -> list[dict[str, Any]]:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(args.concurrency) + 4))
+        results: list[dict[str, Any]] = []
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            operations = {
+                "chat": (_chat_operation(client, args), args.chat_requests),
+                "search": (_search_operation(client), args.requests),
+                "store": (_store_operation(store, args.sessions), args.requests),
+            }
+            print(f"{'scenario':>8} {'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for scenario in args.scenarios:
+                operation, requests = operations[scenario]
+                for concurrency in args.concurrency:
+                    row = {"scenario": scenario, **await drive(operation, concurrency, requests)}
+                    results.append(row)
+                    print(
+                        f"{scenario:>8} {concurrency:>8} {row['throughput_rps']:>8.1f} {row['p50_ms'] or 0:>9.1f} "
+                        f"{row['p95_ms'] or 0:>9.1f} {row['p99_ms'] or 0:>9.1f} {sum(row['errors'].values()):>7}"
+                    )
+        return results
+
+    if "search" in args.scenarios:
+        search_posts("warmup", timeout=120)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(Path(tmp) / "e2e.db")
+        main.store = store
+        results = asyncio.run(run_all(store))
+        store.close()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "fake_llm": fake_settings,
+            "leader_mode": args.leader_mode,
+            "supporting_mode": args.supporting_mode,
+            "use_cache": args.use_cache,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"e2e-{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nsaved {output}")
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main_cli()
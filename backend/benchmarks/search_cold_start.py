@@ -0,0 +1,82 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from backend.app.index_builder import build_index
+
+from .synthetic import reddit_listing, synthetic_posts
+
+# Each mode runs in a fresh interpreter so start-up cost and RSS are not shared.
+_PROBE = """
+import json, sys, time
+from pathlib import Path
+from backend.app.index_builder import resident_memory_mb
+from backend.app.search_index import MappedSearchIndex, SearchIndex, load_dump_posts, tokenize
+
+mode, target = sys.argv[1], Path(sys.argv[2])
+rss_before = resident_memory_mb()
+start = time.perf_counter()
+if mode == "json":
+    posts = []
+    for dump in sorted(target.glob("*.json")):
+        posts.extend(load_dump_posts(dump))
+    index = SearchIndex.build(posts, tokenize)
+    del posts
+else:
+    index = MappedSearchIndex.open(target)
+load_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+index.search(tokenize("cramps fatigue"), 5)
+query_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"load_ms": load_ms, "query_ms": query_ms, "rss_before": rss_before, "rss_after": resident_memory_mb()}))
+"""
+
+
+def _probe(mode: str, target: Path) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode, str(target)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start of JSON loading vs the memory-mapped index.")
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--dumps", type=int, default=4, help="split the corpus into this many dumps/segments")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        dumps_dir = root / "dumps"
+        dumps_dir.mkdir()
+        posts = list(synthetic_posts(args.posts))
+        chunk = -(-len(posts) // args.dumps)
+        dump_paths: list[Path] = []
+        for number in range(args.dumps):
+            path = dumps_dir / f"dump-{number}.json"
+            path.write_text(json.dumps(reddit_listing(posts[number * chunk : (number + 1) * chunk])), encoding="utf-8")
+            dump_paths.append(path)
+        del posts
+
+        index_dir = root / "index"
+        for number, path in enumerate(dump_paths):
+            build_index([path], index_dir, append=number > 0)
+
+        print(f"{'mode':>6} {'load ms':>10} {'query ms':>9} {'rss before MB':>14} {'rss after MB':>13}")
+        for mode, target in (("json", dumps_dir), ("mmap", index_dir)):
+            result = _probe(mode, target)
+            print(
+                f"{mode:>6} {result['load_ms']:>10.1f} {result['query_ms']:>9.2f} "
+                f"{result['rss_before'] or 0:>14.1f} {result['rss_after'] or 0:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
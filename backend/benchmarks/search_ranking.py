@@ -0,0 +1,76 @@
+import argparse
+import statistics
+import time
+from math import log2
+from typing import Any
+
+from backend.app.search_index import SCORERS, SearchIndex, tokenize
+
+from .common import percentile
+from .search_scaling import QUERIES
+from .synthetic import synthetic_posts
+
+
+def _graded_relevance(docs: list[dict[str, Any]], query_tokens: list[str]) -> dict[str, float]:
+    # Ground truth: how many query terms a post's title contains. Titles are held out of the
+    # index, so the judgments do not reuse either scorer's term weighting.
+    terms = set(query_tokens)
+    relevance: dict[str, float] = {}
+    for doc in docs:
+        hits = len(terms.intersection(tokenize(doc["title"])))
+        if hits:
+            relevance[doc["url"]] = float(hits)
+    return relevance
+
+
+def _without_title(doc: dict[str, Any]) -> dict[str, Any]:
+    return {**doc, "text": doc["text"][len(doc["title"]) :].strip()}
+
+
+def _ndcg(ranked_urls: list[str], relevance: dict[str, float], k: int) -> float:
+    gains = [relevance.get(url, 0.0) for url in ranked_urls[:k]]
+    ideal = sorted(relevance.values(), reverse=True)[:k]
+    dcg = sum(gain / log2(rank + 2) for rank, gain in enumerate(gains))
+    idcg = sum(gain / log2(rank + 2) for rank, gain in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare relevance and latency of the search scorers.")
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = list(
+        synthetic_posts(
+            args.posts, words_per_post=10, posts_per_topic=2000, max_words_per_post=300, max_term_repeats=4
+        )
+    )
+    start = time.perf_counter()
+    index = SearchIndex.build((_without_title(doc) for doc in docs), tokenize)
+    print(f"indexed {len(index)} post bodies in {time.perf_counter() - start:.2f}s")
+    print("relevance: query terms in the post title (titles are not indexed)")
+
+    judgments = {query: _graded_relevance(docs, tokenize(query)) for query in QUERIES}
+
+    print(f"{'scorer':>8} {'nDCG@' + str(args.limit):>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for scorer in SCORERS:
+        ndcgs: list[float] = []
+        samples: list[float] = []
+        for query in QUERIES:
+            tokens = tokenize(query)
+            results = index.search(tokens, args.limit, scorer)
+            ndcgs.append(_ndcg([doc["url"] for _, doc in results], judgments[query], args.limit))
+            for _ in range(args.repeats):
+                begin = time.perf_counter()
+                index.search(tokens, args.limit, scorer)
+                samples.append((time.perf_counter() - begin) * 1000)
+        print(
+            f"{scorer:>8} {statistics.mean(ndcgs):>9.3f} {statistics.median(samples):>8.3f} "
+            f"{percentile(samples, 95):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import statistics
+import time
+from collections import Counter
+from math import log
+from typing import Any
+
+from backend.app.search_index import SearchIndex, tokenize
+
+from .common import percentile
+from .synthetic import COMMON_TERMS, TOPIC_TERMS, synthetic_posts
+
+# Topic terms match a fixed number of posts at every corpus size.
+QUERIES = [
+    "cramps",
+    "fatigue insomnia",
+    "migraine nausea backache",
+    "anxiety irritability",
+    "bloating spotting cramps",
+]
+# Common terms match a fixed share of posts, so these exercise posting lists that grow with the corpus.
+COMMON_QUERIES = [
+    "period",
+    "period symptoms",
+    "cramps period",
+]
+
+
+def _legacy_scan(docs: list[dict[str, Any]], query_tokens: list[str], limit: int) -> list[tuple[float, dict[str, Any]]]:
+    scored: list[tuple[float, dict[str, Any]]] = []
+    for doc in docs:
+        score = sum(doc["term_freq"].get(token, 0) for token in query_tokens)
+        if score <= 0:
+            continue
+        popularity_boost = log(doc["ups"] + 1) + log(doc["comments"] + 1)
+        scored.append((score + 0.3 * popularity_boost, doc))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:limit]
+
+
+def _time_queries(run, repeats: int, queries: list[str] = QUERIES) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeats):
+        for query in queries:
+            tokens = tokenize(query)
+            start = time.perf_counter()
+            run(tokens)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query latency of the inverted index as the corpus grows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--scan-max",
+        type=int,
+        default=100_000,
+        help="largest corpus to also time with the legacy full scan (it needs a Counter per post)",
+    )
+    args = parser.parse_args()
+
+    print(f"topic queries: {len(QUERIES)} over topic terms {', '.join(TOPIC_TERMS[:4])}, ...")
+    print(f"common queries: {len(COMMON_QUERIES)} over {', '.join(COMMON_TERMS)} (in a fixed share of posts)")
+    print(
+        f"{'posts':>10} {'build s':>9} {'index p50 ms':>13} {'index p95 ms':>13} {'common p50 ms':>14} "
+        f"{'common p95 ms':>14} {'scan p50 ms':>12}"
+    )
+    for size in args.sizes:
+        docs = list(synthetic_posts(size))
+
+        start = time.perf_counter()
+        index = SearchIndex.build(docs, tokenize)
+        build_seconds = time.perf_counter() - start
+
+        index_samples = _time_queries(lambda tokens: index.search(tokens, args.limit), args.repeats)
+        common_samples = _time_queries(lambda tokens: index.search(tokens, args.limit), args.repeats, COMMON_QUERIES)
+
+        scan_p50 = "-"
+        if size <= args.scan_max:
+            for doc in docs:
+                doc["term_freq"] = Counter(tokenize(doc["text"]))
+            scan_samples = _time_queries(lambda tokens: _legacy_scan(docs, tokens, args.limit), max(1, args.repeats // 4))
+            scan_p50 = f"{statistics.median(scan_samples):.3f}"
+
+        print(
+            f"{size:>10} {build_seconds:>9.2f} {statistics.median(index_samples):>13.3f} "
+            f"{percentile(index_samples, 95):>13.3f} {statistics.median(common_samples):>14.3f} "
+            f"{percentile(common_samples, 95):>14.3f} {scan_p50:>12}"
+        )
+        del docs, index
+
+
+if __name__ == "__main__":
+    main()
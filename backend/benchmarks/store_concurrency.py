@@ -0,0 +1,105 @@
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from backend.app.store import SessionStore
+
+from .common import percentile
+
+
+class _GlobalLockStore(SessionStore):
+    # The previous design: a fresh connection per call and one lock around every read and write.
+    def __init__(self, db_path: Path) -> None:
+        self._global_lock = threading.Lock()
+        super().__init__(db_path)
+
+    @contextmanager
+    def _fresh_connection(self) -> Iterator[sqlite3.Connection]:
+        with self._global_lock:
+            conn = sqlite3.connect(self._db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _read(self):
+        return self._fresh_connection()
+
+    def _write(self):
+        return self._fresh_connection()
+
+
+def _seed(store: SessionStore, sessions: int, turns: int) -> None:
+    for number in range(sessions):
+        for turn in range(turns):
+            store.append_history(f"bench-{number}", "user" if turn % 2 == 0 else "assistant", f"turn {turn} " * 20)
+
+
+def _run(store: SessionStore, threads: int, operations: int, write_ratio: float, sessions: int) -> tuple[float, list[float], list[float]]:
+    reads: list[float] = []
+    writes: list[float] = []
+    samples_lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        local_reads: list[float] = []
+        local_writes: list[float] = []
+        barrier.wait()
+        for _ in range(operations // threads):
+            session_id = f"bench-{rng.randrange(sessions)}"
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                store.append_history(session_id, "user", "another turn " * 20)
+                local_writes.append((time.perf_counter() - start) * 1000)
+            else:
+                store.get_session(session_id)
+                local_reads.append((time.perf_counter() - start) * 1000)
+        with samples_lock:
+            reads.extend(local_reads)
+            writes.extend(local_writes)
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, reads, writes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mixed read/write SessionStore throughput, pooled vs global lock.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--operations", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20, help="history rows seeded per session")
+    args = parser.parse_args()
+
+    print(f"{args.operations} ops per run, {args.write_ratio:.0%} writes, {args.sessions} sessions x {args.turns} turns")
+    print(f"{'store':>12} {'threads':>8} {'ops/s':>8} {'read p50':>9} {'read p95':>9} {'write p50':>10} {'write p95':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (("global-lock", _GlobalLockStore), ("pooled", SessionStore)):
+            store = factory(Path(tmp) / f"{name}.db")
+            _seed(store, args.sessions, args.turns)
+            for threads in args.threads:
+                elapsed, reads, writes = _run(store, threads, args.operations, args.write_ratio, args.sessions)
+                print(
+                    f"{name:>12} {threads:>8} {(len(reads) + len(writes)) / elapsed:>8.0f} "
+                    f"{percentile(reads, 50):>9.2f} {percentile(reads, 95):>9.2f} "
+                    f"{percentile(writes, 50):>10.2f} {percentile(writes, 95):>10.2f}"
+                )
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
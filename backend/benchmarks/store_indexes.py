@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from backend.app.store import MIGRATIONS, SessionStore
+
+from .common import percentile
+
+HISTORY_QUERY = "SELECT role, content FROM conversation_history WHERE session_id = ? ORDER BY id ASC"
+SAVED_QUERY = "SELECT item_json FROM saved_items WHERE session_id = ? AND bucket = ? ORDER BY id ASC"
+
+
+def _seed(db_path: Path, sessions: int, history_rows: int, saved_rows: int, seed: int) -> None:
+    # The unversioned layout every existing local.db has: tables, no secondary indexes.
+    rng = random.Random(seed)
+    now = "2024-01-01T00:00:00+00:00"
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for statement in MIGRATIONS[0]:
+        conn.execute(statement)
+    conn.executemany(
+        "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?)",
+        ((f"session-{number}", now) for number in range(sessions)),
+    )
+    conn.executemany(
+        "INSERT INTO conversation_history (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+        (
+            (f"session-{rng.randrange(sessions)}", "user" if row % 2 == 0 else "assistant", f"turn {row}", now)
+            for row in range(history_rows)
+        ),
+    )
+    item = json.dumps({"message": "cramps", "response": "noted"})
+    conn.executemany(
+        "INSERT INTO saved_items (session_id, bucket, item_json, created_at) VALUES (?, ?, ?, ?)",
+        (
+            (f"session-{rng.randrange(sessions)}", rng.choice(["journal", "audit_logs"]), item, now)
+            for _ in range(saved_rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _time_lookups(run: Callable[[str], object], session_ids: list[str]) -> list[float]:
+    samples: list[float] = []
+    for session_id in session_ids:
+        start = time.perf_counter()
+        run(session_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(f"{label:>34} {statistics.median(samples):>9.3f} {percentile(samples, 95):>9.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session lookups on a large store before and after the index migration.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--history-rows", type=int, default=1_000_000)
+    parser.add_argument("--saved-rows", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=30, help="lookups timed without indexes (each is a table scan)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "large.db"
+        start = time.perf_counter()
+        _seed(db_path, args.sessions, args.history_rows, args.saved_rows, seed=7)
+        print(
+            f"seeded {args.history_rows} history rows and {args.saved_rows} saved items across "
+            f"{args.sessions} sessions in {time.perf_counter() - start:.1f}s"
+        )
+
+        rng = random.Random(11)
+        before_ids = [f"session-{rng.randrange(args.sessions)}" for _ in range(args.lookups)]
+        after_ids = [f"session-{rng.randrange(args.sessions)}" for _ in range(args.lookups * 20)]
+        conn = sqlite3.connect(db_path)
+        print(f"{'lookup':>34} {'p50 ms':>9} {'p95 ms':>9}")
+        _report("history, no index", _time_lookups(lambda sid: conn.execute(HISTORY_QUERY, (sid,)).fetchall(), before_ids))
+        _report(
+            "saved bucket, no index",
+            _time_lookups(lambda sid: conn.execute(SAVED_QUERY, (sid, "journal")).fetchall(), before_ids),
+        )
+
+        start = time.perf_counter()
+        store = SessionStore(db_path)
+        print(f"{'migrated in place to version ' + str(store.schema_version()):>34} {time.perf_counter() - start:>9.2f} s")
+
+        _report("history, indexed", _time_lookups(lambda sid: conn.execute(HISTORY_QUERY, (sid,)).fetchall(), after_ids))
+        _report(
+            "saved bucket, indexed",
+            _time_lookups(lambda sid: conn.execute(SAVED_QUERY, (sid, "journal")).fetchall(), after_ids),
+        )
+        _report("store.get_session, indexed", _time_lookups(store.get_session, after_ids))
+        _report("store.list_saved, indexed", _time_lookups(lambda sid: store.list_saved(sid, "journal"), after_ids))
+        conn.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubLLMServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # Headers and body go out in separate writes; without this Nagle adds ~40 ms per reply.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, payload: dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content: str, model: str) -> None:
+        # Chunked text/event-stream in the shape of OpenAI's streaming completions, one word per chunk.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [word + " " for word in content.split(" ")]
+        pieces[-1] = pieces[-1][:-1]
+        for delta in [{"role": "assistant", "content": ""}, *({"content": piece} for piece in pieces), {}]:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        # /stats, for benchmarks that run the stub in a separate process.
+        with self.server.stats_lock:
+            stats = {
+                "requests": self.server.requests,
+                "connections": self.server.connections,
+                "peak_in_flight": self.server.peak_in_flight,
+            }
+        self._send_json(stats)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0") or 0))
+        if self.path.endswith("/reset"):
+            self.server.reset_stats()
+            self._send_json({"status": "reset"})
+            return
+        with self.server.stats_lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.peak_in_flight = max(self.server.peak_in_flight, self.server.in_flight)
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)
+        finally:
+            with self.server.stats_lock:
+                self.server.in_flight -= 1
+        request = json.loads(body or b"{}")
+        content = self.server.reply
+        if request.get("stream"):
+            self._send_stream(content, request.get("model", "stub"))
+            return
+        payload = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+        self._send_json(payload)
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """OpenAI-compatible /chat/completions stub that counts requests, TCP connections and peak concurrency."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency: float = 0.0, reply: str = "{}", port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.reply = reply
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.stats_lock = threading.Lock()
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        pass  # Clients abandoning requests (e.g. cancelled chats) are expected here.
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self) -> "StubLLMServer":
+        threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True).start()
+        return self
+
+    def reset_stats(self) -> None:
+        with self.stats_lock:
+            self.requests = 0
+            self.connections = 0
+            self.peak_in_flight = self.in_flight
+
+
+class StubLLMProcess:
+    """The stub in its own process, so its threads don't compete with the code being measured."""
+
+    def __init__(self, latency: float = 0.0, port: int = 18765) -> None:
+        self.root_url = f"http://127.0.0.1:{port}"
+        self.base_url = f"{self.root_url}/v1"
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "backend.benchmarks.stub_llm", "--port", str(port), "--latency", str(latency)],
+            cwd=Path(__file__).resolve().parents[2],
+        )
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                self.stats()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    self._process.kill()
+                    raise
+                time.sleep(0.05)
+
+    def stats(self) -> dict[str, int]:
+        with urllib.request.urlopen(f"{self.root_url}/stats", timeout=2) as response:
+            return json.loads(response.read())
+
+    def reset_stats(self) -> None:
+        urllib.request.urlopen(urllib.request.Request(f"{self.root_url}/reset", data=b"{}"), timeout=2).close()
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve an OpenAI-compatible stub LLM.")
+    parser.add_argument("--port", type=int, default=18765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--reply", default="{}")
+    args = parser.parse_args()
+    server = StubLLMServer(latency=args.latency, reply=args.reply, port=args.port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
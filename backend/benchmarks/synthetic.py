@@ -0,0 +1,81 @@
+import random
+from collections.abc import Iterator
+from typing import Any
+
+TOPIC_TERMS = [
+    "cramps",
+    "fatigue",
+    "bloating",
+    "insomnia",
+    "migraine",
+    "irritability",
+    "anxiety",
+    "spotting",
+    "nausea",
+    "backache",
+]
+# Planted in a fixed share of posts, so their posting lists grow with the corpus.
+COMMON_TERMS = ["period", "symptoms"]
+
+
+def synthetic_posts(
+    count: int,
+    seed: int = 443,
+    vocabulary_size: int = 20000,
+    words_per_post: int = 24,
+    posts_per_topic: int = 200,
+    max_words_per_post: int | None = None,
+    max_term_repeats: int = 1,
+    common_term_share: float = 0.05,
+) -> Iterator[dict[str, Any]]:
+    """Yield Reddit-shaped posts.
+
+    Filler words are spread uniformly over the vocabulary, while each topic term is
+    planted in a fixed number of posts so queries for it match the same number of
+    documents no matter how large the corpus is. Each of ``COMMON_TERMS`` is planted in
+    ``common_term_share`` of the posts instead, so its matches grow with the corpus.
+    ``max_words_per_post`` and ``max_term_repeats`` vary post length and topic term
+    frequency for ranking runs.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"w{index}" for index in range(vocabulary_size)]
+    planted: dict[int, list[str]] = {}
+    for term in TOPIC_TERMS:
+        for doc_id in rng.sample(range(count), min(posts_per_topic, count)):
+            planted.setdefault(doc_id, []).append(term)
+
+    for doc_id in range(count):
+        length = rng.randint(words_per_post, max_words_per_post) if max_words_per_post else words_per_post
+        words = rng.choices(vocabulary, k=length)
+        for term in planted.get(doc_id, []):
+            words.extend([term] * rng.randint(1, max_term_repeats))
+        words.extend(term for term in COMMON_TERMS if rng.random() < common_term_share)
+        rng.shuffle(words)
+        title = " ".join(words[:6])
+        yield {
+            "title": title,
+            "text": f"{title} {' '.join(words[6:])}",
+            "url": f"https://www.reddit.com/r/synthetic/comments/{doc_id:x}/",
+            "ups": rng.randint(0, 500),
+            "comments": rng.randint(0, 120),
+        }
+
+
+def reddit_listing(posts: list[dict[str, Any]]) -> dict[str, Any]:
+    """Wrap synthetic posts in the Listing shape of a subreddit JSON dump."""
+    children = []
+    for post in posts:
+        title = post["title"]
+        children.append(
+            {
+                "kind": "t3",
+                "data": {
+                    "title": title,
+                    "selftext": post["text"][len(title) :].strip(),
+                    "url": post["url"],
+                    "ups": post["ups"],
+                    "num_comments": post["comments"],
+                },
+            }
+        )
+    return {"kind": "Listing", "data": {"children": children}}
@@ -0,0 +1,77 @@
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from backend.app.store import SessionStore
+
+
+class _CountingStore(SessionStore):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.transactions = 0
+        super().__init__(*args, **kwargs)
+
+    @contextmanager
+    def _write(self) -> Iterator[Any]:
+        self.transactions += 1
+        with super()._write() as conn:
+            yield conn
+
+
+def _audit_item() -> dict[str, Any]:
+    return {"timestamp": datetime.now(UTC).isoformat(), "active_agent": "yapper", "flagged_segments": []}
+
+
+def _separate_calls(store: SessionStore, session_id: str) -> None:
+    # The previous post-chat sequence: one transaction per call.
+    store.append_history(session_id, "user", "cramps and fatigue before my period")
+    store.append_history(session_id, "assistant", "That sounds exhausting. " * 10)
+    store.set_structured_symptom_list(session_id, ["cramps", "fatigue"])
+    store.set_active_agents(session_id, ["yapper", "definer", "auditor"])
+    store.append_audit_log(session_id, _audit_item())
+    store.save(session_id, "journal", {"message": "cramps", "response": "noted"})
+
+
+def _unit_of_work(store: SessionStore, session_id: str) -> None:
+    with store.unit_of_work(session_id) as turn:
+        turn.append_history("user", "cramps and fatigue before my period")
+        turn.append_history("assistant", "That sounds exhausting. " * 10)
+        turn.set_structured_symptom_list(["cramps", "fatigue"])
+        turn.set_active_agents(["yapper", "definer", "auditor"])
+        turn.append_audit_log(_audit_item())
+        turn.save("journal", {"message": "cramps", "response": "noted"})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Commit latency of persisting one chat turn.")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    print("transactions = WAL fsyncs per turn under synchronous=FULL (NORMAL defers them to checkpoints)")
+    print(f"{'synchronous':>11} {'path':>14} {'turn p50 ms':>12} {'turn mean ms':>13} {'txns/turn':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for synchronous in args.synchronous:
+            for name, persist in (("separate-calls", _separate_calls), ("unit-of-work", _unit_of_work)):
+                store = _CountingStore(Path(tmp) / f"{name}-{synchronous}.db", synchronous=synchronous)
+                store.transactions = 0
+                samples: list[float] = []
+                for turn in range(args.turns):
+                    start = time.perf_counter()
+                    persist(store, f"session-{turn % args.sessions}")
+                    samples.append((time.perf_counter() - start) * 1000)
+                print(
+                    f"{synchronous:>11} {name:>14} {statistics.median(samples):>12.3f} "
+                    f"{statistics.fmean(samples):>13.3f} {store.transactions / args.turns:>10.1f}"
+                )
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import pytest
+
+from backend.app.audit_rules import RuleEngine, parse_rules
+
+
+def _engine(*rules: dict) -> RuleEngine:
+    return RuleEngine(parse_rules({"rules": list(rules)}))
+
+
+def test_rules_matching_the_same_span_are_all_reported() -> None:
+    engine = _engine(
+        {"id": "phrase", "category": "a", "phrases": ["you have"]},
+        {"id": "pattern", "category": "b", "pattern": r"\byou (?:have|had)\b"},
+    )
+    matches = engine.scan("I think you have it.")
+    assert {(match.rule_id, match.start, match.end) for match in matches} == {("phrase", 8, 16), ("pattern", 8, 16)}
+
+
+def test_match_inside_another_rules_match_is_reported() -> None:
+    engine = _engine(
+        {"id": "long", "category": "a", "phrases": ["sounds like you have"]},
+        {"id": "short", "category": "b", "pattern": r"\byou have\b"},
+        {"id": "number", "category": "c", "pattern": r"\d+%"},
+    )
+    matches = engine.scan("It sounds like you have it, 100% and 5%.")
+    assert [(match.rule_id, match.text) for match in matches] == [
+        ("long", "sounds like you have"),
+        ("short", "you have"),
+        ("number", "100%"),
+        ("number", "5%"),
+    ]
+
+
+@pytest.mark.parametrize("pattern", [r"(a)\1", r"(?i)foo", r"(?P<name>foo)", r"x*"])
+def test_patterns_that_would_break_the_combined_regex_are_rejected(pattern: str) -> None:
+    with pytest.raises(ValueError):
+        parse_rules({"rules": [{"id": "bad", "pattern": pattern}]})
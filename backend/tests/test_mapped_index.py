@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from backend.app.index_builder import build_index
+from backend.app.search_index import SCORERS, MappedSearchIndex, SearchIndex, load_dump_posts, tokenize
+from backend.benchmarks.synthetic import reddit_listing, synthetic_posts
+
+QUERIES = ["cramps", "fatigue insomnia", "migraine nausea backache", "period symptoms"]
+
+
+def _dump(path: Path, posts: list[dict]) -> Path:
+    path.write_text(json.dumps(reddit_listing(posts)), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def indexes(tmp_path: Path) -> tuple[MappedSearchIndex, SearchIndex]:
+    posts = list(synthetic_posts(300, posts_per_topic=40, max_words_per_post=60, max_term_repeats=3))
+    first = _dump(tmp_path / "first.json", posts[:200])
+    # Overlaps the first dump by 50 posts; those must not be indexed twice.
+    second = _dump(tmp_path / "second.json", posts[150:])
+    build_index([first], tmp_path / "index")
+    build_index([second], tmp_path / "index", append=True)
+    in_memory = SearchIndex.build(load_dump_posts(first) + load_dump_posts(second)[50:], tokenize)
+    return MappedSearchIndex.open(tmp_path / "index"), in_memory
+
+
+def test_append_adds_a_segment_and_skips_duplicate_urls(indexes: tuple[MappedSearchIndex, SearchIndex]) -> None:
+    mapped, _ = indexes
+    assert [len(segment) for segment in mapped.segments()] == [200, 100]
+    urls = [segment.document(n)["url"] for segment in mapped.segments() for n in range(len(segment))]
+    assert len(urls) == len(set(urls)) == 300
+
+
+@pytest.mark.parametrize("scorer", SCORERS)
+def test_mapped_search_matches_in_memory_index(indexes: tuple[MappedSearchIndex, SearchIndex], scorer: str) -> None:
+    mapped, in_memory = indexes
+    for query in QUERIES:
+        tokens = tokenize(query)
+        expected = [(doc["url"], pytest.approx(score)) for score, doc in in_memory.search(tokens, 10, scorer)]
+        assert expected
+        assert [(doc["url"], score) for score, doc in mapped.search(tokens, 10, scorer)] == expected
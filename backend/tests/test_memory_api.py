@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import main
+from backend.app.store import SessionStore
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(main, "store", SessionStore(tmp_path / "memory.db"))
+    return TestClient(main.app)
+
+
+def test_memory_returns_whole_bucket_or_keyset_pages(client: TestClient) -> None:
+    count = main.MEMORY_PAGE_SIZE + 10
+    for n in range(count):
+        client.post("/memory", json={"bucket": "journal", "content": str(n), "session_id": "s"}).raise_for_status()
+
+    everything = client.get("/memory/journal", params={"session_id": "s"}).json()
+    assert [item["content"] for item in everything["items"]] == [str(n) for n in range(count)]
+    assert everything["next_cursor"] is None
+
+    contents: list[str] = []
+    params: dict[str, object] = {"session_id": "s", "limit": 25}
+    while True:
+        page = client.get("/memory/journal", params=params).json()
+        assert len(page["items"]) <= 25
+        contents.extend(item["content"] for item in page["items"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert contents == [str(n) for n in range(count)]
+
+    # A cursor without a limit pages at MEMORY_PAGE_SIZE.
+    first = client.get("/memory/journal", params={"session_id": "s", "cursor": 0}).json()
+    assert len(first["items"]) == main.MEMORY_PAGE_SIZE and first["next_cursor"] is not None
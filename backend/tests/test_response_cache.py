@@ -0,0 +1,40 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from backend.app import agents, response_cache
+from backend.app.response_cache import MemoryCache, SQLiteCache
+
+
+def test_sqlite_cache_prunes_to_its_cap_every_n_writes(tmp_path: Path) -> None:
+    cache = SQLiteCache(tmp_path / "cache.db", max_entries=10, prune_every=5)
+    for n in range(14):
+        cache.set(f"key-{n}", "value")
+    # The cap is only checked on every 5th write, so writes 11-14 overshoot it until the 15th.
+    assert cache.stats()["entries"] == 14
+    cache.set("key-14", "value")
+    assert cache.stats()["entries"] == 10
+    assert cache.get("key-14") == "value"
+
+
+def test_tool_node_cache_entries_follow_the_search_index_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(response_cache, "_cache", MemoryCache())
+    monkeypatch.setattr(response_cache, "_configured", True)
+    version = {"value": "v1"}
+    monkeypatch.setattr(agents, "index_version", lambda: version["value"])
+    calls: list[str] = []
+
+    async def invoke(system_prompt: str, model_name: str, user_content: str, **kwargs: object) -> str:
+        calls.append(user_content)
+        return f"answer {len(calls)}"
+
+    async def ask() -> str:
+        call = agents._cached_invoke("redditor", invoke, True, {"redditor": "miss"})
+        return await call("prompt", "model", "cramps", tools=["search"])
+
+    assert asyncio.run(ask()) == "answer 1"
+    assert asyncio.run(ask()) == "answer 1"
+    version["value"] = "v2"
+    assert asyncio.run(ask()) == "answer 2"
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from backend.app.scheduler import GraphNode, run_graph
+
+
+def _returning(value: Any, delay: float = 0.0):
+    async def run(inputs: dict[str, Any]) -> Any:
+        await asyncio.sleep(delay)
+        return value
+
+    return run
+
+
+def test_dependents_see_their_inputs_and_cycles_are_rejected() -> None:
+    async def add(inputs: dict[str, Any]) -> int:
+        return inputs["a"] + inputs["b"]
+
+    nodes = [GraphNode("a", _returning(1)), GraphNode("b", _returning(2, 0.01)), GraphNode("sum", add, ("a", "b"))]
+    assert asyncio.run(run_graph(nodes)).results == {"a": 1, "b": 2, "sum": 3}
+
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(run_graph([GraphNode("x", _returning(1), ("y",)), GraphNode("y", _returning(1), ("x",))]))
+
+
+def test_optional_node_past_its_timeout_is_cancelled_and_dependents_still_run() -> None:
+    cancelled: list[str] = []
+
+    async def slow(inputs: dict[str, Any]) -> str:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+        return "late"
+
+    async def after(inputs: dict[str, Any]) -> list[str]:
+        return sorted(inputs)
+
+    nodes = [
+        GraphNode("fast", _returning("ok")),
+        GraphNode("slow", slow, timeout=0.05),
+        GraphNode("after", after, ("fast", "slow")),
+    ]
+    start = time.perf_counter()
+    outcome = asyncio.run(run_graph(nodes))
+    assert time.perf_counter() - start < 1
+    assert cancelled == ["slow"]
+    assert isinstance(outcome.errors["slow"], TimeoutError)
+    assert outcome.timings["slow"]["error"] == "TimeoutError"
+    assert outcome.results == {"fast": "ok", "after": ["fast"]}
+
+
+def test_required_node_timeout_aborts_the_graph_and_cancels_the_rest() -> None:
+    cancelled: list[str] = []
+
+    async def sibling(inputs: dict[str, Any]) -> None:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("sibling")
+            raise
+
+    nodes = [GraphNode("leader", _returning("x", 5), required=True, timeout=0.05), GraphNode("sibling", sibling)]
+    with pytest.raises(TimeoutError):
+        asyncio.run(run_graph(nodes))
+    assert cancelled == ["sibling"]
+
+
+def test_deadline_caps_node_timeouts_for_the_whole_graph() -> None:
+    nodes = [
+        GraphNode("first", _returning("ok", 0.05)),
+        # No timeout of its own, but only ~0.1s of the graph's deadline is left when it starts.
+        GraphNode("second", _returning("late", 5), ("first",)),
+        GraphNode("third", _returning("never", 0), ("second",)),
+    ]
+    start = time.perf_counter()
+    outcome = asyncio.run(run_graph(nodes, deadline=0.15))
+    elapsed = time.perf_counter() - start
+    assert 0.1 < elapsed < 1
+    assert outcome.results["first"] == "ok"
+    assert isinstance(outcome.errors["second"], TimeoutError)
+    # Starts after the deadline has passed, so it gets no time at all.
+    assert isinstance(outcome.errors["third"], TimeoutError)
@@ -0,0 +1,32 @@
+import random
+
+import pytest
+
+from backend.app.search_index import SCORERS, SearchIndex, tokenize
+
+
+def _posts(count: int, seed: int = 7) -> list[dict]:
+    # Few distinct texts and popularity values, so many posts tie on score.
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"post {n}",
+            "text": " ".join(["cramps"] * rng.randint(1, 3) + ["again"] * rng.randint(0, 2)),
+            "url": f"https://example.com/{n}",
+            "ups": rng.choice([0, 10]),
+            "comments": 0,
+        }
+        for n in range(count)
+    ]
+
+
+@pytest.mark.parametrize("scorer", SCORERS)
+def test_ties_at_the_cutoff_keep_corpus_order(scorer: str) -> None:
+    index = SearchIndex.build(_posts(400))
+    full = index.search(tokenize("cramps"), 400, scorer)
+    assert [doc["url"] for _, doc in full] == [
+        doc["url"] for _, doc in sorted(full, key=lambda hit: (-hit[0], int(hit[1]["url"].rsplit("/", 1)[1])))
+    ]
+    for limit in range(1, 60):
+        top = index.search(tokenize("cramps"), limit, scorer)
+        assert [doc["url"] for _, doc in top] == [doc["url"] for _, doc in full[:limit]]
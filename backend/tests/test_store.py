@@ -0,0 +1,110 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from backend.app.store import SCHEMA_VERSION, SessionStore
+
+
+def test_exhausted_pool_raises_instead_of_blocking(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path / "pool.db", pool_size=1, pool_timeout=0.05)
+    with store._pool.connection():
+        with pytest.raises(sqlite3.OperationalError, match="connection pool exhausted"):
+            with store._pool.connection():
+                pass
+    with store._pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+    store.close()
+
+
+def _legacy_database(path: Path) -> None:
+    # The schema SessionStore created before PRAGMA user_version was tracked.
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE sessions (
+            session_id TEXT PRIMARY KEY,
+            structured_symptom_list TEXT NOT NULL DEFAULT '[]',
+            active_agents TEXT NOT NULL DEFAULT '[]',
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE conversation_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE saved_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            item_json TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        INSERT INTO sessions VALUES ('old', '["cramps"]', '["definer"]', '2024-01-01T00:00:00+00:00');
+        INSERT INTO conversation_history (session_id, role, content, created_at)
+            VALUES ('old', 'user', 'hello', '2024-01-01T00:00:00+00:00'),
+                   ('old', 'assistant', 'hi there', '2024-01-01T00:00:01+00:00');
+        INSERT INTO saved_items (session_id, bucket, item_json, created_at)
+            VALUES ('old', 'journal', '{"note": "kept"}', '2024-01-01T00:00:02+00:00');
+        """
+    )
+    conn.close()
+
+
+def test_unversioned_database_is_migrated_in_place(tmp_path: Path) -> None:
+    path = tmp_path / "legacy.db"
+    _legacy_database(path)
+
+    store = SessionStore(path)
+    assert store.schema_version() == SCHEMA_VERSION
+    assert store.recent_history("old", 10) == [
+        {"role": "user", "content": "hello"},
+        {"role": "assistant", "content": "hi there"},
+    ]
+    assert store.list_saved("old", "journal") == [{"note": "kept"}]
+    assert store.get_session("old", fields=["structured_symptom_list"])["structured_symptom_list"] == ["cramps"]
+    store.set_supporting_result("old", "turn-1", "pending")
+    store.close()
+
+    with sqlite3.connect(path) as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert {"idx_conversation_history_session", "session_summaries", "supporting_results"} <= names
+    # Reopening an up-to-date database runs nothing and keeps the data.
+    reopened = SessionStore(path)
+    assert reopened.schema_version() == SCHEMA_VERSION
+    assert reopened.list_saved("old", "journal") == [{"note": "kept"}]
+    reopened.close()
+
+
+def test_database_from_newer_code_is_refused(tmp_path: Path) -> None:
+    path = tmp_path / "future.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError, match="schema version"):
+        SessionStore(path)
+
+
+def test_saved_items_page_by_keyset_cursor(tmp_path: Path) -> None:
+    store = SessionStore(tmp_path / "pages.db")
+    for n in range(7):
+        store.save("s", "journal", {"n": n})
+    store.save("s", "drafts", {"n": "other bucket"})
+    store.save("t", "journal", {"n": "other session"})
+
+    pages: list[list[dict]] = []
+    cursor = None
+    while True:
+        items, cursor = store.list_saved_page("s", "journal", after=cursor, limit=3)
+        pages.append(items)
+        if cursor is None:
+            break
+        if len(pages) == 1:
+            # Rows added while paging land after the cursor; nothing is skipped or repeated.
+            store.save("s", "journal", {"n": 7})
+
+    assert [[item["n"] for item in page] for page in pages] == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert store.list_saved("s", "journal") == [item for page in pages for item in page]
+    assert [item["n"] for _, item in store.iter_saved("s", "journal", batch_size=3)] == list(range(8))
+    store.close()
@@ -0,0 +1,27 @@
+import asyncio
+from typing import Any
+
+from backend.app.supporting_jobs import drain_supporting_jobs, schedule_supporting_job
+
+
+def test_drain_reports_jobs_cancelled_at_shutdown() -> None:
+    results: list[dict[str, Any]] = []
+
+    async def record(result: dict[str, Any]) -> None:
+        results.append(result)
+
+    async def quick() -> dict[str, Any]:
+        return {"answer": 1}
+
+    async def stuck() -> dict[str, Any]:
+        await asyncio.sleep(60)
+        return {}
+
+    async def main() -> int:
+        schedule_supporting_job(quick, record)
+        schedule_supporting_job(stuck, record)
+        return await drain_supporting_jobs(timeout=0.05)
+
+    assert asyncio.run(main()) == 1
+    assert results[0] == {"status": "done", "answer": 1}
+    assert results[1]["status"] == "failed" and "shut down" in results[1]["error"]
@@ -0,0 +1,47 @@
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import agents, main
+from backend.app.store import SessionStore
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(main, "store", SessionStore(tmp_path / "chat.db"))
+    previous = agents.model_provider()
+    agents.set_model_provider("fake")
+    try:
+        with TestClient(main.app) as test_client:
+            yield test_client
+    finally:
+        agents.set_model_provider(previous)
+
+
+def test_supporting_url_survives_special_characters_in_session_id(client: TestClient) -> None:
+    session_id = "alice::R&D #1 + what?"
+    response = client.post(
+        "/chat",
+        json={
+            "message": "cramps and fatigue before my period",
+            "active_agent": "yapper",
+            "enabled_agents": ["yapper", "definer", "redditor"],
+            "session_id": session_id,
+            "supporting_mode": "background",
+            "bypass_cache": True,
+        },
+    )
+    response.raise_for_status()
+    url = response.json()["supporting"]["url"]
+    assert "#" not in url and "&D" not in url
+
+    for _ in range(100):
+        polled = client.get(url)
+        assert polled.status_code == 200
+        if polled.json()["status"] != "pending":
+            break
+        time.sleep(0.05)
+    assert polled.json()["session_id"] == session_id
+    assert polled.json()["status"] == "done"
@@ -3,6 +3,8 @@ const STORAGE_KEY = "retro_chatrooms_v1";
 const FIXED_LEADER_AGENT = "yapper";
 const ALWAYS_ACTIVE_AGENT = "auditor";
 const DEFAULT_AGENTS = [FIXED_LEADER_AGENT, "definer", "redditor", "engager", ALWAYS_ACTIVE_AGENT];
+const SUPPORTING_POLL_MS = 1000;
+const SUPPORTING_POLL_ATTEMPTS = 120;
 
 let currentUser = "";
 let currentRoom = "General Chat";
@@ -272,6 +274,45 @@ function appendLine(role, text) {
   wrapper.appendChild(body);
   chatLog.appendChild(wrapper);
   chatLog.scrollTop = chatLog.scrollHeight;
+  return body;
+}
+
+function updateLine(body, text) {
+  body.innerHTML = renderMarkdownToHtml(text);
+  chatLog.scrollTop = chatLog.scrollHeight;
+}
+
+async function readEventStream(res, onEvent) {
+  // Minimal Server-Sent Events parser over a fetch body (EventSource cannot POST).
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, "\n");
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let eventName = "message";
+      const dataLines = [];
+      block.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) {
+          eventName = line.slice(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.push(line.slice(5).trimStart());
+        }
+      });
+      if (dataLines.length > 0) {
+        onEvent(eventName, JSON.parse(dataLines.join("\n")));
+      }
+    }
+  }
 }
 
 function renderRoomList() {
@@ -319,13 +360,13 @@ function renderCurrentRoom() {
   }
 }
 
-function persistLine(role, text) {
+function persistLine(role, text, room = currentRoom) {
   const userData = getUserData();
-  if (!userData.rooms[currentRoom]) {
-    userData.rooms[currentRoom] = [];
+  if (!userData.rooms[room]) {
+    userData.rooms[room] = [];
   }
 
-  userData.rooms[currentRoom].push({ role, text, timestamp: Date.now() });
+  userData.rooms[room].push({ role, text, timestamp: Date.now() });
   userData.lastRoom = currentRoom;
   saveUserData(userData);
 }
@@ -524,6 +565,37 @@ async function login() {
   }
 }
 
+async function pollSupporting(url, room) {
+  // Background supporting agents finish after the turn returns; fetch their messages when ready.
+  for (let attempt = 0; attempt < SUPPORTING_POLL_ATTEMPTS; attempt += 1) {
+    await new Promise((resolve) => setTimeout(resolve, SUPPORTING_POLL_MS));
+
+    let data;
+    try {
+      const res = await fetch(`${API_BASE_URL}${url}`);
+      if (!res.ok) {
+        if (room === currentRoom) setError(`Could not load supporting agents: ${await res.text()}`);
+        return;
+      }
+      data = await res.json();
+    } catch {
+      continue;
+    }
+
+    if (data.status === "pending") continue;
+    if (data.status === "failed") {
+      if (room === currentRoom) setError(`Supporting agents failed: ${data.error || "unknown error"}`);
+      return;
+    }
+    (data.agent_messages || []).forEach((message) => {
+      const line = `${message.agent}: ${message.text}`;
+      if (room === currentRoom) appendLine("assistant", line);
+      persistLine("assistant", line, room);
+    });
+    return;
+  }
+}
+
 async function sendMessage(event) {
   event.preventDefault();
 
@@ -537,6 +609,7 @@ async function sendMessage(event) {
   messageInput.value = "";
   setError("");
 
+  const room = currentRoom;
   const activeAgent = FIXED_LEADER_AGENT;
   const enabledAgents = Array.from(new Set([activeAgent, ...activeSupportingAgents]));
   const payload = {
@@ -552,7 +625,7 @@ async function sendMessage(event) {
   sendBtn.textContent = "sending...";
 
   try {
-    const res = await fetch(`${API_BASE_URL}/chat`, {
+    const res = await fetch(`${API_BASE_URL}/chat/stream`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(payload),
@@ -562,21 +635,53 @@ async function sendMessage(event) {
       throw new Error(await res.text());
     }
 
-    const data = await res.json();
-    if (Array.isArray(data.agent_messages) && data.agent_messages.length > 0) {
-      data.agent_messages.forEach((msg) => {
-        if (!msg || typeof msg !== "object") return;
-        const agent = typeof msg.agent === "string" ? msg.agent : data.active_agent;
-        const text = typeof msg.text === "string" ? msg.text : "";
-        if (!text.trim()) return;
-        const assistantLine = `${agent}: ${text}`;
-        appendLine("assistant", assistantLine);
-        persistLine("assistant", assistantLine);
-      });
-    } else {
-      const assistantLine = `${data.active_agent}: ${data.response}`;
-      appendLine("assistant", assistantLine);
-      persistLine("assistant", assistantLine);
+    let leaderBody = null;
+    let leaderText = "";
+    let shownMessages = 0;
+    let streamError = "";
+    let supportingUrl = "";
+
+    await readEventStream(res, (eventName, data) => {
+      if (eventName === "token") {
+        leaderText += data.text;
+        const line = `${data.agent}: ${leaderText}`;
+        if (leaderBody) {
+          updateLine(leaderBody, line);
+        } else {
+          leaderBody = appendLine("assistant", line);
+        }
+      } else if (eventName === "leader") {
+        if (!data.text.trim()) return;
+        const line = `${data.agent}: ${data.text}`;
+        if (leaderBody) {
+          updateLine(leaderBody, line);
+        } else {
+          leaderBody = appendLine("assistant", line);
+        }
+        persistLine("assistant", line);
+        shownMessages += 1;
+      } else if (eventName === "agent_message") {
+        const line = `${data.agent}: ${data.text}`;
+        appendLine("assistant", line);
+        persistLine("assistant", line);
+        shownMessages += 1;
+      } else if (eventName === "done") {
+        supportingUrl = (data.supporting && data.supporting.url) || "";
+        if (shownMessages === 0) {
+          const line = `${data.active_agent}: ${data.response}`;
+          appendLine("assistant", line);
+          persistLine("assistant", line);
+        }
+      } else if (eventName === "error") {
+        streamError = data.detail || "Chat stream failed";
+      }
+    });
+
+    if (streamError) {
+      throw new Error(streamError);
+    }
+    if (supportingUrl) {
+      pollSupporting(supportingUrl, room);
     }
   } catch (err) {
     setError(err instanceof Error ? err.message : "Failed to send message");